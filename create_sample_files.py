@@ -1,9 +1,24 @@
 #!/usr/bin/env python3
 """Exemplo simples para testar a GUI do Docling Tool."""
 
+import logging
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Conteúdo dos arquivos de exemplo, codificado em UTF-8 uma única vez na carga do módulo
+SAMPLE_FILES = {
+    filename: content.encode("utf-8")
+    for filename, content in {
+        "sample1.txt": "Este é um arquivo de texto de exemplo.\nEle contém múltiplas linhas.",
+        "sample2.pdf": "Conteúdo simulado de PDF (na realidade seria binário)",
+        "sample3.docx": "Conteúdo simulado de DOCX (na realidade seria binário)",
+        "readme.md": "# Documento de Exemplo\n\nEste é um arquivo Markdown de exemplo."
+    }.items()
+}
+
 def create_sample_files():
     """Cria arquivos de exemplo para testar a GUI."""
     temp_dir = Path(tempfile.mkdtemp(prefix="docling_test_"))
@@ -11,29 +26,29 @@ def create_sample_files():
     input_dir = temp_dir / "sample_input"
     input_dir.mkdir()
     
-    files_to_create = {
-        "sample1.txt": "Este é um arquivo de texto de exemplo.\nEle contém múltiplas linhas.",
-        "sample2.pdf": "Conteúdo simulado de PDF (na realidade seria binário)",
-        "sample3.docx": "Conteúdo simulado de DOCX (na realidade seria binário)",
-        "readme.md": "# Documento de Exemplo\n\nEste é um arquivo Markdown de exemplo."
-    }
-    
-    for filename, content in files_to_create.items():
+    # Escrever os arquivos em paralelo: o trabalho é dominado por syscalls de I/O
+    def write_file(item):
+        filename, content = item
         file_path = input_dir / filename
-        file_path.write_text(content, encoding="utf-8")
-        print(f"Created: {file_path}")
+        file_path.write_bytes(content)
+        return file_path
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for file_path in executor.map(write_file, SAMPLE_FILES.items()):
+            logger.info("Created: %s", file_path)
     
     # Criar diretório de saída
     output_dir = temp_dir / "sample_output"
     output_dir.mkdir()
     
-    print(f"\nSample files created in: {temp_dir}")
-    print(f"Input directory: {input_dir}")
-    print(f"Output directory: {output_dir}")
+    logger.info("\nSample files created in: %s", temp_dir)
+    logger.info("Input directory: %s", input_dir)
+    logger.info("Output directory: %s", output_dir)
     
     return input_dir, output_dir
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("Creating sample files for Docling Tool GUI testing...")
     input_dir, output_dir = create_sample_files()
     
@@ -3,21 +3,18 @@
 Script para criar arquivos de teste para a GUI do Docling Tool
 """
 
+import logging
+import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def create_test_files() -> Path:
-    """Cria arquivos de teste em um diretório temporário."""
-    
-    # Criar diretório temporário que persiste
-    test_dir = Path.cwd() / "test_gui_files"
-    test_dir.mkdir(exist_ok=True)
-    
-    print(f" Criando arquivos de teste em: {test_dir}")
-    
+logger = logging.getLogger(__name__)
+
+# Conteúdo dos arquivos de teste, codificado em UTF-8 uma única vez na carga do módulo
+_TEST_FILES_TEXT = {
     # Arquivo Markdown
-    md_file = test_dir / "teste.md"
-    md_file.write_text("""# Documento de Teste para GUI
+    "teste.md": """# Documento de Teste para GUI
 
 Este é um **documento de teste** para verificar se a GUI do Docling Tool está funcionando corretamente.
 
@@ -43,11 +40,10 @@ def teste_gui():
 ```
 
 **Fim do documento de teste.**
-""", encoding='utf-8')
+""",
     
     # Arquivo HTML
-    html_file = test_dir / "teste.html"
-    html_file.write_text("""<!DOCTYPE html>
+    "teste.html": """<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
@@ -83,30 +79,51 @@ def teste_gui():
     
     <p><em>Arquivo de teste criado com sucesso!</em></p>
 </body>
-</html>""", encoding='utf-8')
+</html>""",
     
     # Arquivo CSV
-    csv_file = test_dir / "teste.csv"
-    csv_file.write_text("""Nome,Idade,Cidade
+    "teste.csv": """Nome,Idade,Cidade
 João,25,São Paulo
 Maria,30,Rio de Janeiro
 Pedro,35,Belo Horizonte
 Ana,28,Porto Alegre
-""", encoding='utf-8')
+""",
+}
+TEST_FILES = {name: content.encode('utf-8') for name, content in _TEST_FILES_TEXT.items()}
+
+def create_test_files() -> Path:
+    """Cria arquivos de teste em um diretório temporário."""
+    
+    # Criar diretório temporário que persiste
+    test_dir = Path.cwd() / "test_gui_files"
+    test_dir.mkdir(exist_ok=True)
+    
+    logger.info(" Criando arquivos de teste em: %s", test_dir)
+    
+    # Escrever os arquivos em paralelo: o trabalho é dominado por syscalls de I/O
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(
+            lambda item: (test_dir / item[0]).write_bytes(item[1]),
+            TEST_FILES.items()
+        ))
     
-    print(f" Criados arquivos de teste:")
-    for file in test_dir.iterdir():
-        if file.is_file():
-            size = file.stat().st_size
-            print(f"  • {file.name} ({size} bytes)")
+    # Relatório em um único bloco: uma escrita em vez de uma por arquivo
+    with os.scandir(test_dir) as entries:
+        report = [
+            f"  • {entry.name} ({entry.stat().st_size} bytes)"
+            for entry in entries
+            if entry.is_file(follow_symlinks=False)
+        ]
+    logger.info(" Criados arquivos de teste:\n%s", "\n".join(report))
     
-    print(f"\n Para testar a GUI:")
-    print(f"1. Execute: python -m src.gui.gui")
-    print(f"2. Input Directory: {test_dir}")
-    print(f"3. Output Directory: {test_dir / 'output'}")
-    print(f"4. Clique em 'Start Processing'")
+    logger.info("\n Para testar a GUI:")
+    logger.info("1. Execute: python -m src.gui.gui")
+    logger.info("2. Input Directory: %s", test_dir)
+    logger.info("3. Output Directory: %s", test_dir / 'output')
+    logger.info("4. Clique em 'Start Processing'")
     
     return test_dir
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     create_test_files()
@@ -8,8 +8,6 @@ __version__ = "1.0.0"
 __author__ = "eduoncode"
 
 # Exportar funções principais
-from .main import build_converter, ensure_dir, process_file, run, setup_logging
-
 __all__ = [
     "build_converter",
     "ensure_dir", 
@@ -17,3 +15,16 @@ __all__ = [
     "run",
     "setup_logging"
 ]
+
+
+def __getattr__(name):
+    """
+    Importa as funções principais de .main sob demanda.
+    
+    Importar .main já na carga do pacote faria `python -m src.main` executar
+    o módulo duas vezes (como src.main e como __main__).
+    """
+    if name in __all__:
+        from . import main
+        return getattr(main, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
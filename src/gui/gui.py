@@ -1,61 +1,188 @@
 """Interface gráfica para o Docling Tool usando Tkinter.
 
 Esta GUI fornece uma interface amigável para o processamento em lote
-de documentos, reutilizando as funções do módulo process.py.
+de documentos, reutilizando as funções do módulo main.py.
 """
 
 from __future__ import annotations
 
 import logging
+import logging.handlers
+import os
+import queue
 import threading
 import time
 import tkinter as tk
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
-from typing import Optional, List
+from typing import Any, Deque, Dict, Iterator, Optional, List, Tuple
+import urllib.error
 import urllib.request
+from contextlib import contextmanager
 
 # Importar funções do módulo existente
 from ..main import (
     build_converter, ensure_dir, process_file, setup_logging,
     check_docling_availability, ProcessingStats, DocumentProcessingError,
-    ConfigurationError, validate_file, SUPPORTED_EXTENSIONS
+    ConfigurationError, valid_file_sizes, iter_candidate_files, write_markdown,
+    CachedTimeFormatter, convert_batch, plan_output_paths
 )
 
 
+# Teclas que continuam funcionando em um Text somente leitura
+_READ_ONLY_NAV_KEYS = frozenset({
+    "Up", "Down", "Left", "Right", "Prior", "Next", "Home", "End"
+})
+_CONTROL_MASK = 0x4
+
+
+def _block_text_edit(event: tk.Event) -> Optional[str]:
+    """Descarta teclas de edição, mantendo navegação, cópia e seleção."""
+    if event.keysym in _READ_ONLY_NAV_KEYS:
+        return None
+    if event.state & _CONTROL_MASK and event.keysym.lower() in ("c", "a"):
+        return None
+    return "break"
+
+
+def make_text_read_only(text_widget: tk.Text) -> None:
+    """
+    Torna um Text somente leitura para o usuário sem usar state=DISABLED.
+    
+    O widget continua NORMAL, então o código pode inserir texto sem alternar
+    o estado (duas chamadas ao Tcl por escrita); teclas de edição, colar e
+    recortar são bloqueados por bindings.
+    
+    Args:
+        text_widget: Widget de texto
+    """
+    text_widget.bind("<Key>", _block_text_edit)
+    for sequence in ("<<Paste>>", "<<PasteSelection>>", "<<Cut>>", "<<Clear>>"):
+        text_widget.bind(sequence, lambda event: "break")
+
+
 class LogHandler(logging.Handler):
-    """Handler customizado para redirecionar logs para a interface gráfica."""
+    """Handler customizado para redirecionar logs para a interface gráfica.
+
+    As mensagens são acumuladas em uma fila e inseridas no widget em lote por
+    um laço de after() na thread principal, a cada FLUSH_INTERVAL_MS. Assim
+    emit() não faz nenhuma chamada ao Tk e pode rodar em qualquer thread
+    (por exemplo, a do QueueListener).
+
+    Mensagens idênticas em sequência são agrupadas em uma única linha com um
+    contador de repetições ("(xN)").
+
+    O widget guarda no máximo max_lines linhas: as mais antigas são descartadas,
+    para que o custo de inserção não cresça com a duração da sessão.
 
-    def __init__(self, text_widget: tk.Text):
+    O widget deve estar no estado NORMAL (ver make_text_read_only): o handler
+    não alterna o estado a cada escrita.
+    """
+
+    FLUSH_INTERVAL_MS = 50
+    MAX_LINES = 5000
+    # Mark do Tk no início da última mensagem escrita (que pode ter várias linhas)
+    LAST_MSG_MARK = "last_msg"
+
+    def __init__(self, text_widget: tk.Text, max_lines: int = MAX_LINES):
         super().__init__()
         self.text_widget = text_widget
+        self.max_lines = max_lines
+        self._queue: Deque[str] = deque()
+        self._alive = True
+        self._last_msg: Optional[str] = None
+        self._repeat_count = 0
+        # Flag Python lida a cada escrita no lugar de winfo_exists() (ida ao Tcl)
+        text_widget.bind("<Destroy>", self._on_destroy, add="+")
+        self._schedule_flush()
 
     def emit(self, record: logging.LogRecord) -> None:
-        """Emite uma mensagem de log para o widget de texto."""
+        """Enfileira uma mensagem de log para a próxima escrita em lote."""
         try:
             msg = self.format(record)
-            # Verificar se o widget ainda existe e se o loop principal está ativo
-            if self.text_widget and self.text_widget.winfo_exists():
-                # Usar after() para thread safety
-                self.text_widget.after(0, self._append_log, msg)
+            if self._alive:
+                self._queue.append(msg)
             else:
                 # Fallback para stdout se GUI não estiver disponível
                 print(f"[GUI LOG] {msg}")
-        except (tk.TclError, RuntimeError) as e:
-            # Se houver erro com Tkinter, usar fallback
-            print(f"[GUI LOG] {self.format(record)}")
         except Exception as e:
             # Evitar que erros no logging quebrem a aplicação
-            print(f"[LOG ERROR] {e}: {self.format(record)}")
+            print(f"[LOG ERROR] {e}: {record.getMessage()}")
+
+    def _on_destroy(self, event: tk.Event) -> None:
+        """Marca o handler como inativo quando o widget é destruído."""
+        self._alive = False
 
-    def _append_log(self, msg: str) -> None:
-        """Adiciona mensagem ao widget de texto (thread-safe)."""
+    def _schedule_flush(self) -> None:
+        """Agenda o próximo flush; desativa o handler se o widget não existir mais."""
         try:
-            if self.text_widget and self.text_widget.winfo_exists():
-                self.text_widget.config(state=tk.NORMAL)
+            self.text_widget.after(self.FLUSH_INTERVAL_MS, self._flush)
+        except (tk.TclError, RuntimeError):
+            self._alive = False
+
+    def _flush(self) -> None:
+        """Escreve no widget todas as mensagens pendentes (thread principal)."""
+        msgs = []
+        while self._queue:
+            msgs.append(self._queue.popleft())
+        if msgs:
+            self._write_batch(msgs)
+        if self._alive:
+            self._schedule_flush()
+
+    def _write_batch(self, msgs: List[str]) -> None:
+        """Agrupa repetições consecutivas e escreve o lote no widget."""
+        # Sequências (mensagem, repetições), continuando a do último lote
+        runs: List[List] = []
+        replace_last = False
+        for msg in msgs:
+            if runs and runs[-1][0] == msg:
+                runs[-1][1] += 1
+            elif not runs and msg == self._last_msg:
+                runs.append([msg, self._repeat_count + 1])
+                replace_last = True
+            else:
+                runs.append([msg, 1])
+
+        self._last_msg, self._repeat_count = runs[-1]
+        lines = [msg if count == 1 else f"{msg} (x{count})" for msg, count in runs]
+        self._append_log(
+            "\n".join(lines), replace_last=replace_last, last_lines=lines[-1].count("\n") + 1
+        )
+
+    def reset_repeat(self) -> None:
+        """Esquece a última mensagem (ex.: após limpar o widget)."""
+        self._last_msg = None
+        self._repeat_count = 0
+
+    def _append_log(self, msg: str, replace_last: bool = False, last_lines: int = 1) -> None:
+        """
+        Adiciona mensagem ao widget de texto (thread-safe).
+
+        Args:
+            msg: Texto a inserir
+            replace_last: Substituir a última mensagem (repetição com contador atualizado)
+            last_lines: Número de linhas da última mensagem contida em msg
+        """
+        try:
+            if self._alive:
+                # Só acompanhar o fim se o usuário não rolou para cima
+                at_bottom = self.text_widget.yview()[1] >= 0.999
+                if replace_last:
+                    # Desde o mark, e não só a última linha: uma mensagem de
+                    # várias linhas seria duplicada a cada repetição
+                    self.text_widget.delete(self.LAST_MSG_MARK, "end-1c")
                 self.text_widget.insert(tk.END, f"{msg}\n")
-                self.text_widget.see(tk.END)
-                self.text_widget.config(state=tk.DISABLED)
+                self.text_widget.mark_set(self.LAST_MSG_MARK, f"end-{last_lines + 1}l linestart")
+                # Descartar as linhas mais antigas acima do limite (a última
+                # linha, após o "\n" final, fica sempre vazia)
+                line_count = int(self.text_widget.index("end-1c").split(".")[0]) - 1
+                if line_count > self.max_lines:
+                    self.text_widget.delete("1.0", f"end-{self.max_lines + 1}l")
+                if at_bottom:
+                    self.text_widget.see(tk.END)
         except (tk.TclError, RuntimeError):
             # Se widget não estiver mais disponível, falhar silenciosamente
             pass
@@ -64,8 +191,19 @@ class LogHandler(logging.Handler):
 class DoclingGUI:
     """Interface gráfica principal para o Docling Tool."""
 
-    def __init__(self, root: tk.Tk):
+    # Intervalo mínimo entre atualizações da barra de progresso (segundos)
+    PROGRESS_INTERVAL = 0.1
+    # Intervalo de leitura da fila de callbacks da thread de processamento (ms)
+    UI_POLL_MS = 50
+    # Arquivos abaixo deste tamanho são convertidos em lotes de BATCH_SIZE
+    SMALL_FILE_SIZE = 1024 * 1024
+    BATCH_SIZE = 16
+
+    def __init__(self, root: tk.Tk, preload_models: bool = True):
         self.root = root
+        # Pré-carregar o conversor padrão em segundo plano na inicialização;
+        # os testes desligam para não carregar modelos
+        self._preload_models = preload_models
         self.root.title("Docling Tool - Document Processing GUI")
         self.root.geometry("800x600")
         self.root.resizable(True, True)
@@ -79,11 +217,27 @@ class DoclingGUI:
         self.table_mode = tk.StringVar(value="accurate")
         self.max_workers = tk.IntVar(value=4)
         self.processing = False
+        # Sinal de cancelamento da execução atual; cada execução recebe um
+        # novo Event, então lotes de uma execução parada nunca são "descancelados"
+        self._cancel_event = threading.Event()
         self.stats = ProcessingStats()
+        self._last_progress_post = 0.0
+        # Conversores ociosos por configuração (ocr_mode, enrichment, table_mode);
+        # cada worker usa um conversor exclusivo (ver _checkout_converter)
+        self._idle_converters: Dict[Tuple[str, bool, str], List[Any]] = {}
+        self._converter_lock = threading.Lock()
+        # Callbacks postados pela thread de processamento para a thread principal
+        self._ui_queue: queue.Queue = queue.Queue()
+        # Jobs (função, argumentos) executados, um por vez, pela thread de processamento
+        self._job_queue: queue.Queue = queue.Queue()
+        self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker_thread.start()
 
         # Configurar interface
         self._create_widgets()
         self._setup_logging()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._drain_ui_queue()
         
         # Verificar docling na inicialização
         self._check_docling_on_startup()
@@ -123,7 +277,7 @@ class DoclingGUI:
         # Barra de progresso
         self.progress_bar = ttk.Progressbar(
             main_frame,
-            mode='indeterminate'
+            mode='determinate'
         )
         self.progress_bar.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(5, 0))
 
@@ -250,8 +404,8 @@ class DoclingGUI:
         self.log_text = tk.Text(
             log_frame,
             height=15,
-            wrap=tk.WORD,
-            state=tk.DISABLED,
+            # Sem quebra de linha: evita o cálculo de wrap a cada inserção
+            wrap=tk.NONE,
             bg="#fefefe",
             fg="#2d2d2d",
             font=("Consolas", 9),
@@ -262,23 +416,34 @@ class DoclingGUI:
             borderwidth=1
         )
         scrollbar = ttk.Scrollbar(log_frame, orient=tk.VERTICAL, command=self.log_text.yview)
-        self.log_text.configure(yscrollcommand=scrollbar.set)
+        h_scrollbar = ttk.Scrollbar(log_frame, orient=tk.HORIZONTAL, command=self.log_text.xview)
+        self.log_text.configure(yscrollcommand=scrollbar.set, xscrollcommand=h_scrollbar.set)
+        make_text_read_only(self.log_text)
 
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        h_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
 
     def _setup_logging(self) -> None:
         """Configura o sistema de logging para a GUI."""
         # Criar handler customizado
         self.log_handler = LogHandler(self.log_text)
         self.log_handler.setFormatter(
-            logging.Formatter("%(asctime)s %(levelname)s: %(message)s", "%H:%M:%S")
+            CachedTimeFormatter("%(asctime)s %(levelname)s: %(message)s", "%H:%M:%S")
+        )
+
+        # Registros passam por uma fila: quem loga apenas enfileira, e a thread
+        # do QueueListener entrega ao LogHandler
+        self._log_queue: queue.Queue = queue.Queue(-1)
+        self._log_listener = logging.handlers.QueueListener(
+            self._log_queue, self.log_handler, respect_handler_level=True
         )
+        self._log_listener.start()
 
         # Configurar logger root
         self.logger = logging.getLogger()
         self.logger.handlers.clear()  # Remove handlers existentes
-        self.logger.addHandler(self.log_handler)
+        self.logger.addHandler(logging.handlers.QueueHandler(self._log_queue))
         self.logger.setLevel(logging.INFO)
 
     def _browse_input_dir(self) -> None:
@@ -304,6 +469,10 @@ class DoclingGUI:
         try:
             check_docling_availability()
             self.logger.info(" Docling está disponível e pronto para uso")
+            # Carregar os modelos da configuração padrão enquanto o usuário
+            # escolhe os diretórios, fora do clique em "Start"
+            if self._preload_models:
+                self._job_queue.put((self._warm_converter, (self._converter_key(),)))
         except ConfigurationError as e:
             self.logger.error(f" Problema com docling: {e}")
             messagebox.showerror(
@@ -324,10 +493,13 @@ class DoclingGUI:
             return
 
         # Validar diretórios
-        input_path = Path(self.input_dir.get())
-        output_path = Path(self.output_dir.get())
+        # absolute() é só manipulação de string (sem resolver symlinks); feito
+        # uma vez aqui, os logs da thread de processamento não refazem o trabalho
+        input_path = Path(self.input_dir.get()).absolute()
+        output_path = Path(self.output_dir.get()).absolute()
 
-        if not input_path.exists():
+        # is_dir() também rejeita um arquivo comum, com o mesmo único stat()
+        if not input_path.is_dir():
             messagebox.showerror("Error", f"Input directory does not exist: {input_path}")
             return
 
@@ -337,20 +509,23 @@ class DoclingGUI:
             messagebox.showerror("Error", f"Cannot create output directory: {e}")
             return
 
-        candidate_files = [
-            p for p in input_path.rglob("*")
-            if p.is_file() and not p.name.startswith('.') and p.suffix.lower() in SUPPORTED_EXTENSIONS
-        ]
+        candidate_files = list(iter_candidate_files(input_path))
         
         if not candidate_files:
             messagebox.showinfo("Info", "No supported files found in input directory")
             return
 
+        # Arquivos com o mesmo nome base (a/x.pdf e b/x.pdf, x.pdf e x.docx)
+        # recebem saídas distintas, em vez de o último a terminar sobrescrever
+        output_paths = plan_output_paths(candidate_files, output_path)
+
         # Configurar UI para processamento
         self.processing = True
+        self._cancel_event = threading.Event()
         self.process_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
-        self.progress_bar.start(10)
+        self.progress_bar.config(maximum=len(candidate_files), value=0)
+        self._last_progress_post = 0.0
 
         # Resetar estatísticas
         self.stats = ProcessingStats(
@@ -362,86 +537,136 @@ class DoclingGUI:
         level = logging.DEBUG if self.verbose_mode.get() else logging.INFO
         self.logger.setLevel(level)
 
-        # Iniciar processamento em thread separada
-        self.processing_thread = threading.Thread(
-            target=self._process_documents,
-            args=(input_path, output_path, candidate_files),
-            daemon=True
-        )
-        self.processing_thread.start()
+        # Enviar para a thread de processamento; as variáveis do Tk são
+        # lidas aqui, na thread principal, e passadas como valores Python
+        self._job_queue.put((
+            self._process_documents,
+            (input_path, output_path, candidate_files,
+             self._converter_key(), self.max_workers.get(), self._cancel_event,
+             output_paths)
+        ))
+
+    def _process_documents(
+        self,
+        input_dir: Path,
+        output_dir: Path,
+        candidate_files: List[Path],
+        converter_key: Optional[Tuple[str, bool, str]] = None,
+        workers: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None,
+        output_paths: Optional[Dict[Path, Path]] = None
+    ) -> None:
+        """
+        Processa documentos em thread separada com melhor tratamento de erros.
+        
+        Args:
+            input_dir: Diretório de entrada
+            output_dir: Diretório de saída
+            candidate_files: Arquivos encontrados
+            converter_key: Configuração do conversor (lida das variáveis do Tk se omitida)
+            workers: Número de workers (lido das variáveis do Tk se omitido)
+            cancel_event: Sinal de cancelamento desta execução (o atual se omitido)
+            output_paths: Arquivo de saída de cada entrada (ver plan_output_paths;
+                calculado aqui se omitido)
+        """
+        if converter_key is None:
+            converter_key = self._converter_key()
+        if workers is None:
+            workers = self.max_workers.get()
+        workers = max(1, workers)
+        if cancel_event is None:
+            cancel_event = self._cancel_event
 
-    def _process_documents(self, input_dir: Path, output_dir: Path, candidate_files: List[Path]) -> None:
-        """Processa documentos em thread separada com melhor tratamento de erros."""
         try:
             self.logger.info(f" Iniciando processamento de {len(candidate_files)} arquivos")
-            self.logger.info(f" Entrada: {input_dir.resolve()}")
-            self.logger.info(f" Saída: {output_dir.resolve()}")
+            self.logger.info(f" Entrada: {input_dir.absolute()}")
+            self.logger.info(f" Saída: {output_dir.absolute()}")
 
-            # Validar arquivos
-            files_to_process = []
-            for file_path in candidate_files:
-                if validate_file(file_path):
-                    files_to_process.append(file_path)
-                else:
-                    self.stats.skipped += 1
+            # Validar arquivos, guardando o tamanho lido pelo mesmo stat()
+            file_sizes = valid_file_sizes(candidate_files)
+            self.stats.skipped += len(candidate_files) - len(file_sizes)
+            files_to_process = list(file_sizes)
 
             self.stats.total_files = len(files_to_process)
             self.logger.info(f" {self.stats.total_files} arquivos válidos para processar")
+            total = max(self.stats.total_files, 1)
+            self._ui_queue.put(lambda: self.progress_bar.config(maximum=total, value=0))
 
             if not files_to_process:
                 self.logger.info(" Nenhum arquivo válido encontrado")
                 return
 
-            # Criar conversor uma vez para toda a sessão
-            self.logger.info(" Criando conversor docling...")
+            if output_paths is None:
+                output_paths = plan_output_paths(files_to_process, output_dir)
+
+            # Reaproveitar o conversor (e os modelos carregados) entre execuções
+            # com a mesma configuração
+            key = converter_key
+            if self._idle_converters.get(key):
+                self.logger.info(" Reutilizando conversor docling já carregado")
+            else:
+                self.logger.info(" Criando conversor docling...")
             try:
-                converter = build_converter(
-                    ocr_mode=self.ocr_mode.get(),
-                    enable_code_enrichment=self.enrichment_mode.get(),
-                    enable_formula_enrichment=self.enrichment_mode.get(),
-                    enable_picture_classification=self.enrichment_mode.get(),
-                    table_mode=self.table_mode.get()
-                )
-                self.logger.info(" Conversor criado com sucesso")
+                # Constrói (ou confirma) o primeiro conversor antes de
+                # distribuir os lotes, para reportar a falha uma única vez
+                with self._checkout_converter(key):
+                    pass
             except Exception as e:
                 self.logger.error(f" Erro ao criar conversor: {e}")
                 return
 
-            # Processar arquivos sequencialmente para evitar problemas com GUI
+            # Processar arquivos em paralelo: a conversão do docling é dominada
+            # por código nativo (OCR, inferência, I/O) que libera o GIL.
+            # Os contadores só são atualizados nesta thread, dentro do laço
+            # de as_completed, então não precisam de lock.
             failed_files = []
-            
-            for i, file_path in enumerate(files_to_process, 1):
-                if not self.processing:  # Verificar se foi cancelado
-                    self.logger.info(" Processamento cancelado pelo usuário")
-                    break
+            self.logger.info(f" Processando com {workers} worker(s)")
 
-                progress_pct = (i / self.stats.total_files) * 100
-                self.logger.info(f" [{i:3d}/{self.stats.total_files}] ({progress_pct:5.1f}%) Processando: {file_path.name}")
-
-                try:
-                    # Processar arquivo individual
-                    output_path = self._process_single_file(
-                        converter, 
-                        file_path, 
-                        output_dir
-                    )
-                    
-                    if output_path:
-                        self.stats.successful += 1
-                        output_size = output_path.stat().st_size
-                        self.logger.info(
-                            f" [{i:3d}/{self.stats.total_files}] Sucesso: {file_path.name} -> {output_path.name} "
-                            f"({output_size / 1024:.1f}KB)"
-                        )
-                    else:
-                        self.stats.failed += 1
-                        failed_files.append((file_path, "Falha no processamento"))
-                        self.logger.error(f" [{i:3d}/{self.stats.total_files}] Falha: {file_path.name}")
-                        
-                except Exception as e:
-                    self.stats.failed += 1
-                    failed_files.append((file_path, str(e)))
-                    self.logger.error(f" [{i:3d}/{self.stats.total_files}] Erro: {file_path.name}: {e}")
+            total = self.stats.total_files
+            executor = ThreadPoolExecutor(max_workers=workers)
+            try:
+                futures = {
+                    executor.submit(self._process_batch, key, batch, output_paths, cancel_event): batch
+                    for batch in self._plan_batches(file_sizes, workers)
+                }
+
+                done = 0
+                for future in as_completed(futures):
+                    if cancel_event.is_set():  # Verificar se foi cancelado
+                        self.logger.info(" Processamento cancelado pelo usuário")
+                        break
+
+                    try:
+                        batch_results = future.result()
+                    except Exception as e:
+                        batch_results = [(file_path, e) for file_path in futures[future]]
+
+                    # Mensagens por arquivo com formatação lazy: só são montadas
+                    # se o nível estiver habilitado
+                    for file_path, result in batch_results:
+                        done += 1
+                        self._post_progress(done, final=(done == total))
+
+                        if isinstance(result, Exception):
+                            self.stats.failed += 1
+                            failed_files.append((file_path, str(result)))
+                            self.logger.error(" [%3d/%d] Erro: %s: %s", done, total, file_path.name, result)
+                        elif result:
+                            output_path, output_size = result
+                            self.stats.successful += 1
+                            self.logger.info(
+                                " [%3d/%d] (%5.1f%%) Sucesso: %s -> %s (%.1fKB)",
+                                done, total, done / total * 100,
+                                file_path.name, output_path.name, output_size / 1024
+                            )
+                        else:
+                            self.stats.failed += 1
+                            failed_files.append((file_path, "Falha no processamento"))
+                            self.logger.error(" [%3d/%d] Falha: %s", done, total, file_path.name)
+            finally:
+                # Esperar os lotes em andamento (cada um para no próximo
+                # arquivo após o cancelamento) antes de liberar o botão Start
+                executor.shutdown(wait=True, cancel_futures=True)
 
             # Relatório final
             self.stats.end_time = time.time()
@@ -462,52 +687,233 @@ class DoclingGUI:
                 if len(failed_files) > 5:
                     self.logger.info(f"  ... e mais {len(failed_files) - 5} arquivos")
 
-            # Mostrar resultado final na thread principal
-            self.root.after(0, lambda: self._show_final_result(failed_files))
+            # Mostrar resultado final na thread principal; after_idle só abre o
+            # diálogo modal depois que a fila de eventos (logs, progresso) esvaziar
+            self._ui_queue.put(lambda: self.root.after_idle(self._show_final_result, failed_files))
 
         except Exception as e:
             self.logger.error(f" Erro crítico no processamento: {e}")
-            # Usar after para chamar messagebox na thread principal
-            self.root.after(0, lambda: messagebox.showerror("Erro Crítico", f"Erro crítico durante processamento:\n\n{e}"))
+            # Usar after_idle para chamar messagebox na thread principal
+            self._ui_queue.put(lambda err=e: self.root.after_idle(
+                messagebox.showerror, "Erro Crítico", f"Erro crítico durante processamento:\n\n{err}"
+            ))
         finally:
-            self.root.after(0, self._processing_finished)
+            self._ui_queue.put(self._processing_finished)
 
-    def _process_single_file(self, converter, file_path: Path, output_dir: Path) -> Optional[Path]:
+    def _post_progress(self, value: int, final: bool = False) -> None:
         """
-        Processa um único arquivo usando o conversor fornecido.
+        Atualiza a barra de progresso na thread principal, no máximo a cada
+        PROGRESS_INTERVAL segundos.
+
+        Args:
+            value: Número de arquivos concluídos
+            final: Sempre publicar (último arquivo)
+        """
+        now = time.monotonic()
+        if not final and now - self._last_progress_post < self.PROGRESS_INTERVAL:
+            return
+        self._last_progress_post = now
+        self._ui_queue.put(lambda: self.progress_bar.configure(value=value))
+
+    def _worker_loop(self) -> None:
+        """Executa os jobs da fila na thread de processamento persistente."""
+        while True:
+            job = self._job_queue.get()
+            if job is None:
+                break
+            func, args = job
+            try:
+                func(*args)
+            except Exception as e:
+                # Manter a thread viva para os próximos jobs
+                self.logger.error(f" Erro na thread de processamento: {e}")
+
+    def _drain_ui_queue(self) -> None:
+        """Executa na thread principal todos os callbacks pendentes e reagenda."""
+        while True:
+            try:
+                callback = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error(f" Erro ao atualizar interface: {e}")
+        try:
+            self.root.after(self.UI_POLL_MS, self._drain_ui_queue)
+        except (tk.TclError, RuntimeError):
+            # Janela já destruída
+            pass
+
+    def _converter_key(self) -> Tuple[str, bool, str]:
+        """Configuração atual do conversor: (ocr_mode, enrichment, table_mode)."""
+        return (self.ocr_mode.get(), self.enrichment_mode.get(), self.table_mode.get())
+
+    def _build_converter(self, key: Tuple[str, bool, str]) -> Any:
+        """
+        Constrói um conversor docling para a configuração.
         
+        Args:
+            key: Configuração (ocr_mode, enrichment, table_mode)
+            
         Returns:
-            Path do arquivo de saída se bem-sucedido, None caso contrário
+            Conversor docling
+        """
+        ocr_mode, enrichment, table_mode = key
+        converter = build_converter(
+            ocr_mode=ocr_mode,
+            enable_code_enrichment=enrichment,
+            enable_formula_enrichment=enrichment,
+            enable_picture_classification=enrichment,
+            table_mode=table_mode
+        )
+        self.logger.info(" Conversor criado com sucesso")
+        return converter
+
+    @contextmanager
+    def _checkout_converter(self, key: Tuple[str, bool, str]) -> Iterator[Any]:
+        """
+        Empresta um conversor exclusivo da configuração, construindo-o se
+        não houver nenhum ocioso, e o devolve ao fim do bloco.
+        
+        O DocumentConverter do docling não documenta ser seguro para uso
+        simultâneo por várias threads (o pipeline e os modelos guardam estado
+        por conversão), então cada worker converte com o seu. Os conversores
+        ficam para as próximas execuções; no máximo um por worker é criado.
+        A construção acontece sob o lock: uma execução iniciada durante o
+        pré-carregamento espera por ele em vez de carregar os modelos em dobro.
+        
+        Args:
+            key: Configuração (ocr_mode, enrichment, table_mode)
+            
+        Yields:
+            Conversor docling de uso exclusivo
         """
+        with self._converter_lock:
+            idle = self._idle_converters.setdefault(key, [])
+            converter = idle.pop() if idle else self._build_converter(key)
         try:
-            # Verificar se o arquivo ainda existe
-            if not file_path.exists():
-                self.logger.warning(f" Arquivo não encontrado: {file_path}")
-                return None
+            yield converter
+        finally:
+            with self._converter_lock:
+                idle.append(converter)
+
+    def _warm_converter(self, key: Tuple[str, bool, str]) -> None:
+        """Pré-carrega um conversor da configuração inicial (thread de fundo)."""
+        try:
+            with self._converter_lock:
+                idle = self._idle_converters.setdefault(key, [])
+                if not idle:
+                    idle.append(self._build_converter(key))
+        except Exception as e:
+            # A execução tentará de novo e reportará o erro
+            self.logger.debug(" Pré-carregamento do conversor falhou: %s", e)
+
+    def _plan_batches(self, file_sizes: Dict[Path, int], workers: int) -> List[List[Path]]:
+        """
+        Agrupa os arquivos em lotes para convert_all.
+        
+        Arquivos pequenos (< SMALL_FILE_SIZE) vão em lotes de até BATCH_SIZE,
+        amortizando o custo fixo de cada chamada ao conversor, sem deixar
+        workers ociosos quando há poucos arquivos; os grandes seguem sozinhos
+        e são submetidos primeiro, para equilibrar os workers.
+        
+        Args:
+            file_sizes: Arquivos já validados e seus tamanhos em bytes
+            workers: Número de workers
+            
+        Returns:
+            Lista de lotes
+        """
+        sized = sorted(((size, p) for p, size in file_sizes.items()), reverse=True)
+        large = [[p] for size, p in sized if size >= self.SMALL_FILE_SIZE]
+        small = [p for size, p in reversed(sized) if size < self.SMALL_FILE_SIZE]
+        batch_size = max(1, min(self.BATCH_SIZE, -(-len(small) // workers)))
+        return large + [
+            small[start:start + batch_size]
+            for start in range(0, len(small), batch_size)
+        ]
+
+    def _process_batch(
+        self, key: Tuple[str, bool, str], batch: List[Path], output_paths: Dict[Path, Path],
+        cancel_event: threading.Event
+    ) -> List[Tuple[Path, Optional[Tuple[Path, int]]]]:
+        """
+        Processa um lote de arquivos com uma única chamada a convert_all.
+        
+        Arquivos que o lote não converteu (ou conversores sem convert_all)
+        são convertidos individualmente.
+        
+        Args:
+            key: Configuração do conversor
+            batch: Arquivos do lote
+            output_paths: Arquivo de saída de cada entrada
+            cancel_event: Sinal de cancelamento da execução que criou o lote
+        
+        Returns:
+            Lista (arquivo de entrada, resultado de _process_single_file)
+        """
+        if cancel_event.is_set():
+            return []
+        with self._checkout_converter(key) as converter:
+            documents = convert_batch(converter, batch)
+            results = []
+            for file_path in batch:
+                if cancel_event.is_set():
+                    break
+                results.append(
+                    (file_path, self._process_single_file(
+                        converter, file_path, output_paths[file_path].parent,
+                        documents.pop(file_path, None), output_paths[file_path]
+                    ))
+                )
+        return results
 
-            # Converter documento
-            doc_result = converter.convert(file_path)
-            doc = doc_result.document
+    def _process_single_file(
+        self, converter, file_path: Path, output_dir: Path, document=None,
+        output_path: Optional[Path] = None
+    ) -> Optional[Tuple[Path, int]]:
+        """
+        Processa um único arquivo usando o conversor fornecido.
+        
+        O arquivo acabou de passar por valid_file_sizes(); se tiver sumido desde
+        então, o próprio conversor levanta o erro.
+        
+        Args:
+            converter: Conversor docling
+            file_path: Arquivo de entrada
+            output_dir: Diretório de saída
+            document: Documento já convertido em lote (opcional)
+            output_path: Arquivo de saída (padrão: output_dir/<stem>.md)
+        
+        Returns:
+            (Path do arquivo de saída, tamanho em bytes) se bem-sucedido, None caso contrário
+        """
+        try:
+            # Converter documento (se o lote ainda não o converteu)
+            doc = document
+            if doc is None:
+                doc = converter.convert(file_path).document
             
             # Exportar para markdown
             text_markdown = doc.export_to_markdown()
             
-            if not text_markdown.strip():
-                self.logger.warning(f" Documento vazio após conversão: {file_path.name}")
+            # isspace() evita a cópia do documento inteiro feita por strip()
+            if not text_markdown or text_markdown.isspace():
+                self.logger.warning(" Documento vazio após conversão: %s", file_path.name)
                 return None
             
             # Salvar arquivo
-            output_filename = f"{file_path.stem}.md"
-            output_path = output_dir / output_filename
+            if output_path is None:
+                output_path = output_dir / f"{file_path.stem}.md"
             
-            # Escrever arquivo com encoding UTF-8
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(text_markdown)
+            # Mesma escrita do CLI: arquivo temporário + rename atômico
+            output_size = write_markdown(text_markdown, output_path)
             
-            return output_path
+            return output_path, output_size
             
         except Exception as e:
-            self.logger.error(f" Erro ao processar {file_path.name}: {e}")
+            self.logger.error(" Erro ao processar %s: %s", file_path.name, e)
             return None
 
     def _show_final_result(self, failed_files: List) -> None:
@@ -539,6 +945,7 @@ class DoclingGUI:
 
     def _stop_processing(self) -> None:
         """Para o processamento."""
+        self._cancel_event.set()
         self.processing = False
         self.logger.info("Processing stopped by user")
 
@@ -547,36 +954,124 @@ class DoclingGUI:
         self.processing = False
         self.process_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
-        self.progress_bar.stop()
+
+    def _on_close(self) -> None:
+        """Encerra o listener de logs e fecha a janela."""
+        self._cancel_event.set()
+        self.processing = False
+        self._job_queue.put(None)
+        self._log_listener.stop()
+        self.root.destroy()
 
     def _clear_log(self) -> None:
         """Limpa a área de log."""
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        self.log_handler.reset_repeat()
+
+
+AZURE_THEME_URL = "https://raw.githubusercontent.com/rdbende/Azure-ttk-theme/main/azure.tcl"
+AZURE_THEME_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "docling_tool" / "azure.tcl"
+)
 
 
 def setup_azure_theme(root: tk.Tk) -> bool:
     """
     Configura o tema Azure moderno para a interface.
     
+    O arquivo do tema fica em cache em AZURE_THEME_PATH, com o ETag da última
+    resposta ao lado. Se já existir, é aplicado na hora e revalidado em segundo
+    plano com um GET condicional (a atualização vale para a próxima execução).
+    Se não existir, o download é feito em uma thread de fundo e o tema é
+    aplicado pelo laço do Tk quando terminar; a janela abre na hora com o
+    tema alternativo.
+    
+    Returns:
+        bool: True se o tema foi aplicado agora, False caso contrário
+    """
+    cached = AZURE_THEME_PATH.exists()
+    
+    threading.Thread(
+        target=_download_azure_theme,
+        args=(root, AZURE_THEME_PATH, not cached),
+        daemon=True
+    ).start()
+    
+    if cached:
+        return _apply_azure_theme(root, AZURE_THEME_PATH)
+    return False
+
+
+def _fetch_azure_theme(azure_tcl_path: Path) -> bool:
+    """
+    Baixa o tema Azure com GET condicional (If-None-Match).
+    
+    Args:
+        azure_tcl_path: Caminho do arquivo em cache
+        
+    Returns:
+        bool: True se o arquivo foi (re)escrito, False se o cache já estava atualizado
+    """
+    etag_path = azure_tcl_path.with_name(f"{azure_tcl_path.name}.etag")
+    request = urllib.request.Request(AZURE_THEME_URL)
+    if azure_tcl_path.exists() and etag_path.exists():
+        request.add_header("If-None-Match", etag_path.read_text(encoding="utf-8").strip())
+    
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            data = response.read()
+            etag = response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return False
+        raise
+    
+    azure_tcl_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = azure_tcl_path.with_suffix(".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(azure_tcl_path)
+    if etag:
+        etag_path.write_text(etag, encoding="utf-8")
+    else:
+        etag_path.unlink(missing_ok=True)
+    return True
+
+
+def _download_azure_theme(root: tk.Tk, azure_tcl_path: Path, apply: bool) -> None:
+    """
+    Baixa ou revalida o tema Azure (thread de fundo) e, se pedido, agenda sua
+    aplicação na thread principal.
+    """
+    if apply:
+        print("Baixando tema Azure...")
+    try:
+        updated = _fetch_azure_theme(azure_tcl_path)
+    except Exception as e:
+        print(f"Erro ao baixar tema Azure: {e}")
+        return
+    
+    if not updated:
+        return
+    print("Tema Azure baixado com sucesso!")
+    if not apply:
+        return
+    
+    try:
+        root.after(0, lambda: _apply_azure_theme(root, azure_tcl_path))
+    except (tk.TclError, RuntimeError):
+        # Janela fechada antes do fim do download
+        pass
+
+
+def _apply_azure_theme(root: tk.Tk, azure_tcl_path: Path) -> bool:
+    """
+    Aplica o tema Azure a partir de um arquivo local.
+    
     Returns:
         bool: True se o tema foi aplicado com sucesso, False caso contrário
     """
     try:
-        # Tentar baixar o tema Azure se não existir
-        azure_tcl_path = Path("azure.tcl")
-        
-        if not azure_tcl_path.exists():
-            print("Baixando tema Azure...")
-            azure_url = "https://raw.githubusercontent.com/rdbende/Azure-ttk-theme/main/azure.tcl"
-            try:
-                urllib.request.urlretrieve(azure_url, azure_tcl_path)
-                print("Tema Azure baixado com sucesso!")
-            except Exception as e:
-                print(f"Erro ao baixar tema Azure: {e}")
-                return False
-        
         # Aplicar tema Azure
         root.tk.call("source", str(azure_tcl_path))
         root.tk.call("set_theme", "light")
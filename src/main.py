@@ -1,49 +1,80 @@
 from __future__ import annotations
 
 import argparse
+import ctypes
+import gc
+import heapq
+import io
+import importlib.util
+import json
 import logging
+import multiprocessing
 import os
+import random
+import stat
 import sys
-import tempfile
+import threading
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed, Future
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, Future, wait
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import count, islice
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, TextIO, Tuple, Any
 import psutil
 import signal
 
-# Verificação robusta de importações do docling
-DOCLING_AVAILABLE = False
-DOCLING_ERROR = None
-
-try:
-    from docling.document_converter import DocumentConverter, PdfFormatOption
-    from docling.datamodel.base_models import InputFormat, DocumentStream
-    from docling.datamodel.pipeline_options import (
-        EasyOcrOptions, 
-        PdfPipelineOptions, 
-        TableFormerMode
-    )
-    from docling.utils.model_downloader import download_models
-    DOCLING_AVAILABLE = True
-except ImportError as e:
-    DOCLING_ERROR = str(e)
-    DocumentConverter = None
+# Verificação robusta de importações do docling; o import em si (pesado) é
+# adiado até o primeiro uso em _load_docling()
+DOCLING_AVAILABLE = importlib.util.find_spec("docling") is not None
+DOCLING_ERROR = None if DOCLING_AVAILABLE else "No module named 'docling'"
+
+_docling: Optional[SimpleNamespace] = None
+
+if TYPE_CHECKING:
+    from docling.document_converter import DocumentConverter
 
 
 logger = logging.getLogger(__name__)
 
 # Constantes melhoradas
-SUPPORTED_EXTENSIONS = {
+# Extensões em minúsculas; arquivos fora deste conjunto nunca chegam ao docling
+SUPPORTED_EXTENSIONS = frozenset({
     ".pdf", ".docx", ".xlsx", ".pptx", ".md", ".html", ".xhtml", 
     ".csv", ".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".webp"
-}
+})
+# Diretórios que não são percorridos (além dos ocultos, como .git e .venv)
+SKIPPED_DIRS = frozenset({"__pycache__", "node_modules"})
 
 DEFAULT_MAX_WORKERS = min(4, (os.cpu_count() or 1))
 DEFAULT_TIMEOUT = 300  # 5 minutos por arquivo
 DEFAULT_MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
 DEFAULT_MAX_PAGES = 1000
+DEFAULT_DOC_BATCH_SIZE = 2  # Usado se as configurações do docling não estiverem disponíveis
+SUBMIT_WINDOW_FACTOR = 4  # Tarefas pendentes por worker no pool de processos
+# Erros que podem passar numa nova tentativa (I/O, rede); os demais (documento
+# vazio, erro de parsing) se repetiriam, então falham sem retry
+TRANSIENT_ERRORS = (OSError, TimeoutError, ConnectionError)
+PROGRESS_EVERY = 100  # Arquivos entre linhas de progresso agregadas no console
+PROGRESS_INTERVAL = 1.0  # Segundos máximos entre linhas de progresso
+VALIDATION_THREADS = 16  # Threads para os stat() da validação (I/O, libera o GIL)
+RELEASE_MEMORY_EVERY = 8  # Arquivos processados entre liberações de memória (gc + malloc_trim)
+
+# Sufixo único dos arquivos temporários de write_markdown dentro do processo
+_tmp_names = count()
+
+# Conversor reutilizado por cada processo worker (ver _init_worker)
+_worker_converter: Optional[DocumentConverter] = None
+
+# Liberação periódica de memória (ver _file_done): só em processos de vida
+# longa, ligada por _init_worker (workers do pool) e por serve (--server)
+_periodic_release = False
+# Conversões bem-sucedidas desde a última liberação, por thread
+_release_counter = threading.local()
+_malloc_trim: Optional[Any] = None
 
 @dataclass
 class ProcessingStats:
@@ -78,29 +109,65 @@ class DocumentProcessingError(DoclingError):
     pass
 
 
+class TransientProcessingError(DocumentProcessingError):
+    """Falha de processamento causada por erro transitório (pode passar numa nova tentativa)."""
+    pass
+
+
 class ConfigurationError(DoclingError):
     """Erro de configuração."""
     pass
 
 
-def setup_logging(verbose: bool = False, log_file: Optional[Path] = None) -> None:
+class CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter que reaproveita o timestamp formatado dentro do mesmo segundo.
+    
+    Com um datefmt sem frações de segundo, time.strftime passa a ser chamado
+    uma vez por segundo em vez de uma vez por registro.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_time: Tuple[int, str] = (-1, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        """Formata o horário do registro, reutilizando o último valor do mesmo segundo."""
+        if datefmt is None:
+            # O formato padrão inclui milissegundos; não há o que reaproveitar
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        cached_second, cached_text = self._cached_time
+        if second != cached_second:
+            cached_text = super().formatTime(record, datefmt)
+            self._cached_time = (second, cached_text)
+        return cached_text
+
+
+def setup_logging(
+    verbose: bool = False,
+    log_file: Optional[Path] = None,
+    stream: Optional[TextIO] = None
+) -> None:
     """
     Configura o sistema de logging com suporte a arquivo e formatação melhorada.
     
     Args:
         verbose: Se True, habilita logging DEBUG
         log_file: Caminho para arquivo de log (opcional)
+        stream: Stream do console (padrão: sys.stdout)
     """
     level = logging.DEBUG if verbose else logging.INFO
     
     # Formatador detalhado
-    formatter = logging.Formatter(
+    formatter = CachedTimeFormatter(
         "%(asctime)s | %(levelname)-8s | %(name)s:%(lineno)d | %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     
     # Handler para console
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = logging.StreamHandler(stream or sys.stdout)
     console_handler.setFormatter(formatter)
     console_handler.setLevel(level)
     
@@ -123,6 +190,48 @@ def setup_logging(verbose: bool = False, log_file: Optional[Path] = None) -> Non
             logger.warning(f" Não foi possível criar arquivo de log {log_file}: {e}")
 
 
+def _load_docling() -> SimpleNamespace:
+    """
+    Importa o docling na primeira chamada e memoriza as classes utilizadas.
+    
+    Returns:
+        Namespace com as classes e funções do docling usadas pelo módulo
+        
+    Raises:
+        ImportError: Se o docling não puder ser importado
+    """
+    global _docling, DOCLING_AVAILABLE, DOCLING_ERROR
+    if _docling is None:
+        try:
+            from docling.document_converter import DocumentConverter, PdfFormatOption
+            from docling.datamodel.base_models import ConversionStatus, DocumentStream, InputFormat
+            from docling.datamodel.pipeline_options import (
+                EasyOcrOptions, 
+                PdfPipelineOptions, 
+                TableFormerMode
+            )
+            from docling.datamodel.settings import settings
+            from docling.utils.model_downloader import download_models
+        except ImportError as e:
+            DOCLING_AVAILABLE = False
+            DOCLING_ERROR = str(e)
+            raise
+        
+        _docling = SimpleNamespace(
+            DocumentConverter=DocumentConverter,
+            PdfFormatOption=PdfFormatOption,
+            ConversionStatus=ConversionStatus,
+            DocumentStream=DocumentStream,
+            InputFormat=InputFormat,
+            EasyOcrOptions=EasyOcrOptions,
+            PdfPipelineOptions=PdfPipelineOptions,
+            TableFormerMode=TableFormerMode,
+            settings=settings,
+            download_models=download_models
+        )
+    return _docling
+
+
 def check_docling_availability() -> None:
     """
     Verifica se o docling está disponível e funcional.
@@ -130,6 +239,12 @@ def check_docling_availability() -> None:
     Raises:
         ConfigurationError: Se o docling não estiver disponível
     """
+    if DOCLING_AVAILABLE:
+        try:
+            _load_docling()
+        except ImportError:
+            pass
+    
     if not DOCLING_AVAILABLE:
         error_msg = (
             f" Docling não está disponível: {DOCLING_ERROR}\n"
@@ -142,35 +257,78 @@ def check_docling_availability() -> None:
     logger.debug(" Docling está disponível e importado com sucesso")
 
 
-def check_system_resources() -> Dict[str, Any]:
+def _filesystem_type(path: Path) -> str:
+    """
+    Tipo do sistema de arquivos que contém path (ex.: ext4, overlay, tmpfs).
+    
+    Args:
+        path: Caminho existente
+        
+    Returns:
+        Tipo do sistema de arquivos, ou "" se não puder ser determinado
+    """
+    try:
+        partitions = psutil.disk_partitions(all=True)
+    except Exception:
+        return ""
+    # O ponto de montagem mais específico que contém o caminho
+    best = None
+    for partition in partitions:
+        mountpoint = Path(partition.mountpoint)
+        if (path == mountpoint or mountpoint in path.parents) and (
+            best is None or len(partition.mountpoint) > len(best.mountpoint)
+        ):
+            best = partition
+    return best.fstype if best else ""
+
+
+def check_system_resources(output_dir: Optional[Path] = None) -> Dict[str, Any]:
     """
     Verifica recursos do sistema disponíveis.
     
+    Args:
+        output_dir: Diretório de saída; o espaço livre é medido no sistema de
+            arquivos dele (padrão: o diretório atual)
+    
     Returns:
         Dicionário com informações de recursos
     """
     cpu_count = os.cpu_count() or 1
     memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
+    
+    # O diretório de saída pode ainda não existir: usar o ancestral mais próximo
+    disk_path = (output_dir or Path.cwd()).absolute()
+    while not disk_path.exists() and disk_path != disk_path.parent:
+        disk_path = disk_path.parent
+    disk = psutil.disk_usage(str(disk_path))
     
     resources = {
         'cpu_count': cpu_count,
         'memory_total_gb': memory.total / (1024**3),
         'memory_available_gb': memory.available / (1024**3),
         'memory_percent': memory.percent,
-        'disk_free_gb': disk.free / (1024**3)
+        'disk_free_gb': disk.free / (1024**3),
+        'disk_path': disk_path,
+        'fs_type': _filesystem_type(disk_path)
     }
     
     logger.info(f" Sistema: {cpu_count} CPUs, "
                f"{resources['memory_available_gb']:.1f}GB RAM disponível "
                f"({resources['memory_percent']:.1f}% em uso)")
+    logger.debug(
+        " Saída em %s (%s): %.1fGB livres",
+        disk_path, resources['fs_type'] or "?", resources['disk_free_gb']
+    )
     
     # Avisos sobre recursos limitados
     if resources['memory_available_gb'] < 2:
         logger.warning(" Pouca memória disponível (<2GB). Considere usar menos workers.")
     
     if resources['disk_free_gb'] < 1:
-        logger.warning(" Pouco espaço em disco (<1GB).")
+        logger.warning(f" Pouco espaço em disco (<1GB) em {disk_path}.")
+    
+    if resources['fs_type'] == "tmpfs":
+        logger.warning(f" A saída está em tmpfs ({disk_path}): os arquivos gerados ocupam RAM.")
     
     return resources
 
@@ -187,7 +345,7 @@ def ensure_dir(path: Path) -> None:
     """
     try:
         path.mkdir(parents=True, exist_ok=True)
-        logger.debug(f" Diretório garantido: {path}")
+        logger.debug(" Diretório garantido: %s", path)
         
         # Verificar permissões
         if not os.access(path, os.W_OK):
@@ -199,45 +357,133 @@ def ensure_dir(path: Path) -> None:
         raise ConfigurationError(error_msg)
 
 
-def validate_file(file_path: Path, max_size: int = DEFAULT_MAX_FILE_SIZE) -> bool:
+def valid_file_size(file_path: Path, max_size: int = DEFAULT_MAX_FILE_SIZE) -> Optional[int]:
     """
-    Valida se um arquivo pode ser processado.
+    Valida um arquivo e retorna seu tamanho, com um único stat().
+    
+    Quem precisa do tamanho depois (ordenação, logs) reaproveita este valor
+    em vez de chamar stat() de novo.
     
     Args:
         file_path: Caminho do arquivo
         max_size: Tamanho máximo em bytes
         
     Returns:
-        True se o arquivo é válido
+        Tamanho em bytes se o arquivo é válido, None caso contrário
     """
     try:
-        if not file_path.exists():
-            logger.debug(f" Arquivo não existe: {file_path}")
-            return False
+        # Um único stat() responde existência, tipo e tamanho
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            logger.debug(" Arquivo não existe: %s", file_path)
+            return None
             
-        if not file_path.is_file():
-            logger.debug(f" Não é um arquivo: {file_path}")
-            return False
+        if not stat.S_ISREG(st.st_mode):
+            logger.debug(" Não é um arquivo: %s", file_path)
+            return None
             
         if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            logger.debug(f" Extensão não suportada: {file_path}")
-            return False
+            logger.debug(" Extensão não suportada: %s", file_path)
+            return None
             
-        file_size = file_path.stat().st_size
+        file_size = st.st_size
         if file_size > max_size:
-            logger.warning(f" Arquivo muito grande ({file_size / (1024**2):.1f}MB): {file_path}")
-            return False
+            logger.warning(" Arquivo muito grande (%.1fMB): %s", file_size / (1024**2), file_path)
+            return None
             
         if file_size == 0:
-            logger.warning(f" Arquivo vazio: {file_path}")
-            return False
+            logger.warning(" Arquivo vazio: %s", file_path)
+            return None
             
-        logger.debug(f" Arquivo válido: {file_path} ({file_size / (1024**2):.1f}MB)")
-        return True
+        logger.debug(" Arquivo válido: %s (%.1fMB)", file_path, file_size / (1024**2))
+        return file_size
         
     except Exception as e:
-        logger.error(f" Erro ao validar {file_path}: {e}")
-        return False
+        logger.error(" Erro ao validar %s: %s", file_path, e)
+        return None
+
+
+def valid_file_sizes(
+    file_paths: List[Path], max_size: int = DEFAULT_MAX_FILE_SIZE
+) -> Dict[Path, int]:
+    """
+    Valida vários arquivos, sobrepondo os stat() em threads quando são muitos
+    (em sistemas de arquivos de rede, cada stat() é uma ida e volta).
+    
+    Args:
+        file_paths: Arquivos candidatos
+        max_size: Tamanho máximo em bytes
+        
+    Returns:
+        Arquivos válidos -> tamanho em bytes, na ordem de file_paths
+    """
+    def check(file_path: Path) -> Optional[int]:
+        return valid_file_size(file_path, max_size)
+    
+    # Para poucos arquivos, criar as threads custa mais do que os stat()
+    if len(file_paths) < 4 * VALIDATION_THREADS:
+        sizes = list(map(check, file_paths))
+    else:
+        with ThreadPoolExecutor(max_workers=VALIDATION_THREADS) as executor:
+            sizes = list(executor.map(check, file_paths))
+    return {
+        file_path: size
+        for file_path, size in zip(file_paths, sizes)
+        if size is not None
+    }
+
+
+def validate_file(file_path: Path, max_size: int = DEFAULT_MAX_FILE_SIZE) -> bool:
+    """
+    Valida se um arquivo pode ser processado.
+    
+    Args:
+        file_path: Caminho do arquivo
+        max_size: Tamanho máximo em bytes
+        
+    Returns:
+        True se o arquivo é válido
+    """
+    return valid_file_size(file_path, max_size) is not None
+
+
+def iter_candidate_files(input_dir: Path) -> Iterator[Path]:
+    """
+    Percorre o diretório de entrada recursivamente com os.scandir.
+    
+    Os DirEntry reaproveitam o tipo lido junto com o diretório, evitando um
+    stat() por entrada como em Path.rglob + Path.is_file. Diretórios ocultos
+    e os de SKIPPED_DIRS são podados sem serem listados.
+    
+    Args:
+        input_dir: Diretório de entrada
+        
+    Yields:
+        Arquivos não ocultos com extensão suportada, fora de diretórios podados
+    """
+    pending = [str(input_dir)]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name[0] != '.' and entry.name not in SKIPPED_DIRS:
+                            pending.append(entry.path)
+                        continue
+                    # Extensão direto do nome (str), sem o custo de os.path.splitext
+                    name = entry.name
+                    dot = name.rfind('.')
+                    if (
+                        dot > 0
+                        and name[0] != '.'
+                        and name[dot:].lower() in SUPPORTED_EXTENSIONS
+                        and entry.is_file()
+                    ):
+                        yield Path(entry.path)
+        except OSError as e:
+            logger.warning(" Não foi possível listar %s: %s", current, e)
 
 
 def build_converter(
@@ -272,25 +518,26 @@ def build_converter(
         ConfigurationError: Se houver erro na configuração
     """
     try:
-        logger.debug(f" Construindo conversor: OCR={ocr_mode}, tabela={enable_table_structure}")
+        logger.debug(" Construindo conversor: OCR=%s, tabela=%s", ocr_mode, enable_table_structure)
+        
+        docling = _load_docling()
         
-        # Configurações de OCR
-        if ocr_mode == "always":
-            ocr_options = EasyOcrOptions(force_full_page_ocr=True)
-        elif ocr_mode == "never":
-            ocr_options = EasyOcrOptions(force_full_page_ocr=False)
-        else:  # auto
-            ocr_options = EasyOcrOptions()
-
         # Configurações de pipeline PDF
-        pipeline_options = PdfPipelineOptions(
+        pipeline_options = docling.PdfPipelineOptions(
             do_ocr=(ocr_mode != "never"),
-            ocr_options=ocr_options,
             do_table_structure=enable_table_structure,
             artifacts_path=str(artifacts_path) if artifacts_path else None,
             enable_remote_services=enable_remote_services
         )
         
+        # Configurações de OCR (com 'never' o motor de OCR não é configurado)
+        if ocr_mode == "always":
+            pipeline_options.ocr_options = docling.EasyOcrOptions(force_full_page_ocr=True)
+        elif ocr_mode == "auto":
+            pipeline_options.ocr_options = docling.EasyOcrOptions()
+        else:
+            logger.debug(" OCR desabilitado")
+        
         # Configurações de enriquecimento
         if enable_code_enrichment:
             pipeline_options.do_code_enrichment = True
@@ -311,19 +558,19 @@ def build_converter(
         # Configurações de TableFormer
         if enable_table_structure:
             if table_mode == "fast":
-                pipeline_options.table_structure_options.mode = TableFormerMode.FAST
+                pipeline_options.table_structure_options.mode = docling.TableFormerMode.FAST
                 logger.debug(" TableFormer modo: FAST")
             else:
-                pipeline_options.table_structure_options.mode = TableFormerMode.ACCURATE
+                pipeline_options.table_structure_options.mode = docling.TableFormerMode.ACCURATE
                 logger.debug(" TableFormer modo: ACCURATE")
             
             # Opcionalmente desabilitar cell matching para melhor qualidade
             pipeline_options.table_structure_options.do_cell_matching = True
 
         # Criar conversor
-        converter = DocumentConverter(
+        converter = docling.DocumentConverter(
             format_options={
-                InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+                docling.InputFormat.PDF: docling.PdfFormatOption(pipeline_options=pipeline_options)
             }
         )
         
@@ -336,6 +583,32 @@ def build_converter(
         raise ConfigurationError(error_msg)
 
 
+@lru_cache(maxsize=4)
+def _cached_converter(options: Tuple[Tuple[str, Any], ...]) -> DocumentConverter:
+    """Constrói o conversor para um conjunto (congelado) de opções; ver cached_converter."""
+    return build_converter(**dict(options))
+
+
+def cached_converter(**kwargs: Any) -> DocumentConverter:
+    """
+    Retorna um conversor para as opções dadas, reaproveitando o já construído
+    neste processo quando as opções são as mesmas.
+    
+    Quatro entradas cobrem as combinações usuais (fast/accurate x
+    enriquecimento); falhas de construção não ficam em cache.
+    
+    Args:
+        **kwargs: Argumentos de build_converter
+        
+    Returns:
+        DocumentConverter configurado
+        
+    Raises:
+        ConfigurationError: Se houver erro na configuração
+    """
+    return _cached_converter(tuple(sorted(kwargs.items())))
+
+
 def download_models_if_needed(force: bool = False) -> bool:
     """
     Baixa modelos do docling se necessário.
@@ -349,7 +622,7 @@ def download_models_if_needed(force: bool = False) -> bool:
     try:
         if force:
             logger.info(" Forçando download de modelos...")
-            download_models()
+            _load_docling().download_models()
             logger.info(" Modelos baixados com sucesso")
             return True
         else:
@@ -362,6 +635,258 @@ def download_models_if_needed(force: bool = False) -> bool:
         return False
 
 
+def write_markdown(text_markdown: str, path_output_file: Path) -> int:
+    """
+    Escreve o Markdown no destino final.
+    
+    Toda saída passa por um arquivo temporário oculto no próprio diretório de
+    saída, de modo que a troca final é um rename atômico no mesmo sistema de
+    arquivos: uma execução interrompida nunca deixa um .md truncado.
+    
+    Args:
+        text_markdown: Conteúdo Markdown
+        path_output_file: Caminho do arquivo de saída
+        
+    Returns:
+        Número de bytes escritos
+    """
+    # Codificar uma única vez e escrever em modo binário
+    data = text_markdown.encode("utf-8")
+    
+    # Escrita direta no descritor, sem as camadas de buffer do Python: para
+    # saídas pequenas, um único os.write. O nome temporário é único por
+    # chamada (PID + contador): threads ou workers gravando o mesmo destino
+    # não truncam o temporário um do outro
+    tmp_path = path_output_file.with_name(
+        f".{path_output_file.name}.{os.getpid()}.{next(_tmp_names)}.tmp"
+    )
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        
+        # Mover arquivo temporário para destino final
+        os.replace(tmp_path, path_output_file)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return len(data)
+
+
+def plan_output_paths(files: List[Path], output_dir: Path) -> Dict[Path, Path]:
+    """
+    Calcula o arquivo de saída de cada entrada, sem destinos repetidos.
+    
+    A busca é recursiva, então a/x.pdf e b/x.pdf (ou x.pdf e x.docx) dariam
+    o mesmo x.md; a partir do segundo, em ordem de caminho, o nome recebe um
+    sufixo numérico (x_2.md, ...) com um aviso, em vez de uma saída
+    sobrescrever a outra em silêncio.
+    
+    Args:
+        files: Arquivos de entrada
+        output_dir: Diretório de saída
+        
+    Returns:
+        Mapeamento arquivo de entrada -> arquivo de saída, na ordem de files
+    """
+    names: Dict[Path, str] = {}
+    taken = set()
+    # Nomes atribuídos em ordem de caminho: o resultado não depende da
+    # ordem de processamento (ex.: LPT com vários workers)
+    for file_path in sorted(files, key=str):
+        stem = file_path.stem
+        name = f"{stem}.md"
+        suffix = 1
+        # casefold: x.md e X.md são o mesmo arquivo em sistemas sem distinção de caixa
+        while name.casefold() in taken:
+            suffix += 1
+            name = f"{stem}_{suffix}.md"
+        if suffix > 1:
+            logger.warning(" Saída repetida para %s: gravando em %s", file_path, name)
+        taken.add(name.casefold())
+        names[file_path] = name
+    return {file_path: output_dir / names[file_path] for file_path in files}
+
+
+def release_memory() -> None:
+    """
+    Devolve ao sistema a memória liberada por documentos já processados.
+    
+    Coleta ciclos de referência (documentos do docling guardam referências
+    cruzadas), esvazia o cache da GPU se o torch já estiver em uso e, na glibc,
+    chama malloc_trim(0) para que as páginas livres do heap voltem ao sistema
+    em vez de o RSS de um worker longo só crescer.
+    """
+    global _malloc_trim
+    gc.collect()
+    
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available() and torch.cuda.is_initialized():
+        torch.cuda.empty_cache()
+    
+    if _malloc_trim is None and sys.platform.startswith("linux"):
+        try:
+            _malloc_trim = ctypes.CDLL("libc.so.6").malloc_trim
+        except (OSError, AttributeError):
+            # Sem glibc (ex.: musl): nada a devolver explicitamente
+            _malloc_trim = False
+    if _malloc_trim:
+        _malloc_trim(0)
+
+
+def _file_done() -> None:
+    """
+    Conta uma conversão bem-sucedida e libera memória a cada
+    RELEASE_MEMORY_EVERY, se a liberação periódica estiver ligada.
+    
+    Fica desligada na CLI de execução única e nas threads da GUI: lá o
+    gc.collect() pararia as outras threads e o malloc_trim disputaria o lock
+    do malloc com conversões em andamento, para um processo que logo termina.
+    """
+    if not _periodic_release:
+        return
+    files = getattr(_release_counter, "files", 0) + 1
+    if files >= RELEASE_MEMORY_EVERY:
+        files = 0
+        release_memory()
+    _release_counter.files = files
+
+
+def _fadvise(file_path: Path, advice_name: str) -> None:
+    """
+    Aplica uma dica posix_fadvise ao arquivo inteiro.
+    
+    Sem efeito onde posix_fadvise (ou a dica) não existe. É só uma dica:
+    nenhum erro escapa daqui (são apenas registrados), para não mascarar o
+    erro real do chamador.
+    
+    Args:
+        file_path: Arquivo alvo
+        advice_name: Nome da constante em os (ex.: "POSIX_FADV_WILLNEED")
+    """
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        finally:
+            os.close(fd)
+    except Exception as e:
+        logger.debug(" posix_fadvise(%s) ignorado para %s: %s", advice_name, file_path, e)
+
+
+def prefetch_file(file_path: Path) -> None:
+    """
+    Pede ao kernel que comece a ler o arquivo para o page cache em segundo
+    plano (WILLNEED), sobrepondo o I/O de disco ao OCR do arquivo atual.
+    
+    Args:
+        file_path: Arquivo que será convertido em breve
+    """
+    _fadvise(file_path, "POSIX_FADV_WILLNEED")
+
+
+def drop_file_cache(file_path: Path) -> None:
+    """
+    Libera do page cache um arquivo já convertido (DONTNEED), para que ele
+    não desloque páginas ainda úteis, como os pesos dos modelos.
+    
+    A dica vale para o inode, então funciona mesmo com o docling tendo
+    aberto o arquivo por conta própria.
+    
+    Args:
+        file_path: Arquivo que não será mais lido
+    """
+    _fadvise(file_path, "POSIX_FADV_DONTNEED")
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Espera antes da tentativa attempt (>= 1): backoff exponencial limitado a
+    10s, com jitter de ±25% para que workers que falharam juntos não tentem
+    de novo ao mesmo tempo.
+    
+    Args:
+        attempt: Número da nova tentativa
+        
+    Returns:
+        Espera em segundos
+    """
+    return min(2 ** attempt, 10) * random.uniform(0.75, 1.25)
+
+
+def _warmup_pdf() -> bytes:
+    """Monta um PDF mínimo (uma página, uma linha de texto) para o aquecimento."""
+    content = b"BT /F1 24 Tf 72 720 Td (Docling warmup) Tj ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+    ]
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def warmup_converter(converter: DocumentConverter) -> None:
+    """
+    Faz uma conversão descartável de um PDF de uma página.
+    
+    A primeira conversão paga imports tardios, inicialização do OCR e dos
+    modelos; fazê-la aqui tira esse custo do primeiro documento real.
+    
+    Args:
+        converter: Conversor a aquecer
+    """
+    start = time.perf_counter()
+    try:
+        stream = _load_docling().DocumentStream(name="warmup.pdf", stream=io.BytesIO(_warmup_pdf()))
+        converter.convert(stream)
+        logger.info(f" Conversor aquecido em {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        logger.warning(f" Aquecimento do conversor falhou: {e}")
+
+
+def _init_worker(converter_kwargs: Dict[str, Any], warmup: bool = False) -> None:
+    """
+    Inicializador dos processos worker: constrói o conversor uma única vez
+    por processo, amortizando o carregamento dos modelos entre arquivos.
+    
+    Args:
+        converter_kwargs: Argumentos repassados para build_converter
+        warmup: Fazer uma conversão de aquecimento após construir o conversor
+    """
+    global _worker_converter, _periodic_release
+    # Workers vivem por toda a execução: liberar memória periodicamente
+    _periodic_release = True
+    # Se já existe, foi herdado do processo pai via fork (--preload-models)
+    if _worker_converter is None:
+        try:
+            _worker_converter = build_converter(**converter_kwargs)
+        except ConfigurationError:
+            # process_file tentará novamente e reportará o erro por arquivo
+            _worker_converter = None
+            return
+    if warmup:
+        warmup_converter(_worker_converter)
+
+
 def process_file(
     input_path: Path, 
     output_dir: Path, 
@@ -370,7 +895,11 @@ def process_file(
     max_file_size: int = DEFAULT_MAX_FILE_SIZE,
     timeout: int = DEFAULT_TIMEOUT,
     enable_enrichment: bool = False,
-    retry_count: int = 2
+    retry_count: int = 2,
+    converter: Optional[DocumentConverter] = None,
+    document: Optional[Any] = None,
+    output_path: Optional[Path] = None,
+    first_attempt: int = 0
 ) -> Tuple[Path, Dict[str, Any]]:
     """
     Processa um único arquivo com retry e estatísticas detalhadas.
@@ -383,7 +912,14 @@ def process_file(
         max_file_size: Tamanho máximo do arquivo
         timeout: Timeout em segundos
         enable_enrichment: Habilitar recursos de enriquecimento
-        retry_count: Número de tentativas em caso de falha
+        retry_count: Número de novas tentativas em caso de erro transitório (TRANSIENT_ERRORS)
+        converter: Conversor já construído (padrão: o do worker atual)
+        document: Documento já convertido (ex.: via convert_batch); usado na
+            primeira tentativa no lugar de uma nova conversão
+        output_path: Caminho de saída já calculado (padrão: output_dir/<stem>.md)
+        first_attempt: Tentativas já feitas por quem chamou (ex.: novas tentativas
+            agendadas por _schedule), para que mensagens e estatísticas contem
+            o total
 
     Returns:
         Tuple com caminho do arquivo de saída e estatísticas
@@ -401,98 +937,108 @@ def process_file(
     }
     
     try:
-        # Validar arquivo
-        if not validate_file(input_path, max_file_size):
+        # Validar arquivo (o mesmo stat() fornece o tamanho)
+        file_size = valid_file_size(input_path, max_file_size)
+        if file_size is None:
             raise DocumentProcessingError(f"Arquivo inválido: {input_path}")
         
-        stats['file_size'] = input_path.stat().st_size
+        stats['file_size'] = file_size
         
-        logger.info(f" Processando: {input_path.name} ({stats['file_size'] / (1024**2):.1f}MB)")
+        logger.debug(" Processando: %s (%.1fMB)", input_path.name, stats['file_size'] / (1024**2))
         
-        # Criar conversor específico para este processo
-        converter = build_converter(
-            ocr_mode=ocr_mode,
-            enable_code_enrichment=enable_enrichment,
-            enable_formula_enrichment=enable_enrichment,
-            enable_picture_classification=enable_enrichment
-        )
+        # Reutilizar o conversor do chamador ou do worker; construir só se não houver
+        if converter is None:
+            converter = _worker_converter
+        if converter is None and document is None:
+            converter = cached_converter(
+                ocr_mode=ocr_mode,
+                enable_code_enrichment=enable_enrichment,
+                enable_formula_enrichment=enable_enrichment,
+                enable_picture_classification=enable_enrichment
+            )
         
         # Tentativas com retry
         last_error = None
-        for attempt in range(retry_count + 1):
+        last_attempt = first_attempt + retry_count
+        for attempt in range(first_attempt, last_attempt + 1):
             try:
                 if attempt > 0:
                     stats['retry_attempts'] = attempt
-                    logger.warning(f" Tentativa {attempt + 1}/{retry_count + 1}: {input_path.name}")
-                    time.sleep(min(2 ** attempt, 10))  # Backoff exponencial
+                if attempt > first_attempt:
+                    logger.warning(" Tentativa %d/%d: %s", attempt + 1, last_attempt + 1, input_path.name)
+                    time.sleep(retry_delay(attempt))
                 
                 # Processar com limite de páginas e timeout
-                if input_path.suffix.lower() == '.pdf':
-                    doc_result = converter.convert(
-                        input_path, 
-                        max_num_pages=max_pages,
-                        max_file_size=max_file_size
-                    )
+                if attempt == first_attempt and document is not None:
+                    doc = document
                 else:
-                    doc_result = converter.convert(input_path)
-                
-                doc = doc_result.document
+                    if converter is None:
+                        converter = cached_converter(
+                            ocr_mode=ocr_mode,
+                            enable_code_enrichment=enable_enrichment,
+                            enable_formula_enrichment=enable_enrichment,
+                            enable_picture_classification=enable_enrichment
+                        )
+                    if input_path.suffix.lower() == '.pdf':
+                        doc_result = converter.convert(
+                            input_path, 
+                            max_num_pages=max_pages,
+                            max_file_size=max_file_size
+                        )
+                    else:
+                        doc_result = converter.convert(input_path)
+                    
+                    doc = doc_result.document
                 
                 # Estatísticas do documento
                 if hasattr(doc, 'pages'):
                     stats['pages_processed'] = len(doc.pages)
-                    logger.debug(f" {stats['pages_processed']} páginas processadas")
+                    logger.debug(" %d páginas processadas", stats['pages_processed'])
                 
                 # Exportar para markdown
-                logger.debug(f" Exportando para Markdown: {input_path.name}")
+                logger.debug(" Exportando para Markdown: %s", input_path.name)
                 text_markdown = doc.export_to_markdown()
                 
-                if not text_markdown.strip():
+                # isspace() evita a cópia do documento inteiro feita por strip()
+                if not text_markdown or text_markdown.isspace():
                     raise DocumentProcessingError("Documento vazio após processamento")
                 
                 # Salvar arquivo
-                output_filename = f"{input_path.stem}.md"
-                path_output_file = output_dir / output_filename
+                path_output_file = output_path or output_dir / f"{input_path.stem}.md"
                 
-                # Usar arquivo temporário para escrita atômica
-                with tempfile.NamedTemporaryFile(
-                    mode="w", 
-                    encoding="utf-8", 
-                    delete=False, 
-                    dir=output_dir,
-                    prefix=f"{input_path.stem}_",
-                    suffix=".md.tmp"
-                ) as tmpf:
-                    tmpf.write(text_markdown)
-                    tmp_path = Path(tmpf.name)
-
-                # Mover arquivo temporário para destino final
-                tmp_path.replace(path_output_file)
+                output_size = write_markdown(text_markdown, path_output_file)
                 
                 # Calcular estatísticas finais
                 stats['processing_time'] = time.time() - start_time
-                output_size = path_output_file.stat().st_size
                 
-                logger.info(
-                    f" Sucesso: {input_path.name} -> {path_output_file.name} "
-                    f"({output_size / 1024:.1f}KB, {stats['processing_time']:.1f}s)"
+                logger.debug(
+                    " Sucesso: %s -> %s (%.1fKB, %.1fs)", input_path.name, path_output_file.name,
+                    output_size / 1024, stats['processing_time']
                 )
                 
+                # Só depois de uma conversão bem-sucedida o arquivo foi lido
+                # por inteiro e não será lido de novo
+                drop_file_cache(input_path)
+                _file_done()
                 return path_output_file, stats
                 
             except Exception as e:
                 last_error = e
                 error_msg = f"Tentativa {attempt + 1} falhou: {str(e)}"
                 stats['errors'].append(error_msg)
-                logger.debug(f" {error_msg}")
+                logger.debug(" %s", error_msg)
                 
-                if attempt == retry_count:
+                if attempt == last_attempt or not isinstance(e, TRANSIENT_ERRORS):
                     break
         
-        # Se chegou aqui, todas as tentativas falharam
+        # Se chegou aqui, todas as tentativas falharam (ou o erro não é transitório)
         stats['processing_time'] = time.time() - start_time
-        error_msg = f"Falha após {retry_count + 1} tentativas: {last_error}"
-        logger.error(f" {input_path.name}: {error_msg}")
+        error_msg = f"Falha após {attempt + 1} tentativa(s): {last_error}"
+        if isinstance(last_error, TRANSIENT_ERRORS):
+            # Quem chamou ainda pode agendar uma nova tentativa (ver _run_parallel)
+            logger.warning(" %s: %s", input_path.name, error_msg)
+            raise TransientProcessingError(error_msg)
+        logger.error(" %s: %s", input_path.name, error_msg)
         raise DocumentProcessingError(error_msg)
         
     except Exception as e:
@@ -504,6 +1050,412 @@ def process_file(
         raise
 
 
+def convert_batch(
+    converter: DocumentConverter,
+    input_paths: List[Path],
+    max_pages: int = DEFAULT_MAX_PAGES,
+    max_file_size: int = DEFAULT_MAX_FILE_SIZE
+) -> Dict[Path, Any]:
+    """
+    Converte vários arquivos de uma vez com a API em lote do docling
+    (convert_all), amortizando o aquecimento do pipeline entre documentos.
+    
+    Args:
+        converter: Conversor já construído
+        input_paths: Arquivos a converter
+        max_pages: Número máximo de páginas
+        max_file_size: Tamanho máximo do arquivo
+        
+    Returns:
+        Dicionário arquivo -> documento para as conversões bem-sucedidas;
+        arquivos ausentes devem ser reprocessados individualmente
+    """
+    documents: Dict[Path, Any] = {}
+    if len(input_paths) < 2 or not hasattr(converter, "convert_all"):
+        return documents
+    
+    try:
+        success = _load_docling().ConversionStatus.SUCCESS
+        for result in converter.convert_all(
+            input_paths,
+            raises_on_error=False,
+            max_num_pages=max_pages,
+            max_file_size=max_file_size
+        ):
+            if result.status == success:
+                documents[Path(result.input.file)] = result.document
+    except Exception as e:
+        logger.debug(" Conversão em lote falhou, usando conversão individual: %s", e)
+    
+    return documents
+
+
+def _run_sequential(
+    output_paths: Dict[Path, Path],
+    output_dir: Path,
+    converter: DocumentConverter,
+    process_kwargs: Dict[str, Any],
+    batch_size: int = DEFAULT_DOC_BATCH_SIZE
+) -> Iterator[Tuple[Path, Future]]:
+    """
+    Processa arquivos no próprio processo com um único conversor, convertendo
+    em lotes de batch_size arquivos.
+    
+    Args:
+        output_paths: Mapeamento arquivo de entrada -> arquivo de saída
+        output_dir: Diretório de saída
+        converter: Conversor compartilhado
+        process_kwargs: Argumentos repassados para process_file
+        batch_size: Número de arquivos por chamada a convert_batch
+    
+    Yields:
+        Tuplas (arquivo, future já resolvido) na ordem de entrada
+    """
+    files = list(output_paths)
+    for start in range(0, len(files), batch_size):
+        batch = files[start:start + batch_size]
+        # Ler o próximo lote do disco enquanto este é convertido
+        for next_path in files[start + batch_size:start + 2 * batch_size]:
+            prefetch_file(next_path)
+        documents = convert_batch(
+            converter,
+            batch,
+            max_pages=process_kwargs.get('max_pages', DEFAULT_MAX_PAGES),
+            max_file_size=process_kwargs.get('max_file_size', DEFAULT_MAX_FILE_SIZE)
+        )
+        
+        for file_path in batch:
+            future: Future = Future()
+            try:
+                future.set_result(
+                    process_file(
+                        file_path,
+                        output_dir,
+                        converter=converter,
+                        document=documents.pop(file_path, None),
+                        output_path=output_paths[file_path],
+                        **process_kwargs
+                    )
+                )
+            except Exception as e:
+                future.set_exception(e)
+            yield file_path, future
+
+
+def _preload_converter(converter_kwargs: Dict[str, Any]) -> Optional[DocumentConverter]:
+    """
+    Constrói o conversor e carrega o pipeline de PDF (modelos) no processo atual.
+    
+    Args:
+        converter_kwargs: Argumentos repassados para build_converter
+        
+    Returns:
+        Conversor pronto, ou None se não puder ser construído
+    """
+    try:
+        converter = build_converter(**converter_kwargs)
+        if hasattr(converter, "initialize_pipeline"):
+            converter.initialize_pipeline(_load_docling().InputFormat.PDF)
+        logger.info(" Modelos pré-carregados no processo principal")
+        return converter
+    except Exception as e:
+        logger.warning(f" Falha ao pré-carregar modelos; cada worker carregará os seus: {e}")
+        return None
+
+
+def _mp_context() -> Optional[multiprocessing.context.BaseContext]:
+    """
+    Contexto de multiprocessing para o pool de workers.
+    
+    No Linux, fork faz os workers herdarem (copy-on-write) os módulos já
+    importados pelo processo pai — docling, torch, easyocr — em vez de
+    reimportá-los em cada worker. Nos demais sistemas, usa o padrão.
+    
+    Returns:
+        Contexto fork no Linux, None (padrão da plataforma) nos demais
+    """
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork")
+    return None
+
+
+@contextmanager
+def _worker_pool(
+    workers: int,
+    converter_kwargs: Dict[str, Any],
+    preload: bool = False,
+    warmup: bool = False
+) -> Iterator[ProcessPoolExecutor]:
+    """
+    Pool de processos worker, cada um com seu próprio conversor.
+    
+    Com preload e fork, o conversor (e os pesos dos modelos) é construído
+    uma vez no processo pai e herdado pelos workers: as páginas dos tensores
+    só são lidas, então continuam compartilhadas (copy-on-write) em vez de
+    uma cópia por worker.
+    
+    Args:
+        workers: Número de processos
+        converter_kwargs: Argumentos repassados para build_converter em cada worker
+        preload: Construir o conversor no processo pai antes do fork
+        warmup: Aquecer o conversor de cada worker com uma conversão descartável
+    
+    Yields:
+        Executor pronto para receber tarefas
+    """
+    global _worker_converter
+    mp_context = _mp_context()
+    if preload:
+        if mp_context is None:
+            logger.warning(" --preload-models requer fork (Linux); cada worker carregará seus modelos")
+        else:
+            _worker_converter = _preload_converter(converter_kwargs)
+    
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(converter_kwargs, warmup)
+        ) as executor:
+            yield executor
+    finally:
+        # O conversor pré-carregado pertence a este pool
+        _worker_converter = None
+
+
+def _schedule(
+    executor: ProcessPoolExecutor,
+    jobs: Iterator[Tuple[Path, Path, Optional[Path]]],
+    window: int,
+    process_kwargs: Dict[str, Any],
+    read_ahead: bool = False
+) -> Iterator[Tuple[Path, Future]]:
+    """
+    Escalonador comum a _run_parallel e serve: janela deslizante de tarefas
+    pendentes e novas tentativas de erros transitórios agendadas no processo pai.
+    
+    Args:
+        executor: Pool de workers (ver _worker_pool)
+        jobs: Tuplas (arquivo, diretório de saída, arquivo de saída ou None)
+        window: Máximo de tarefas pendentes no pool
+        process_kwargs: Argumentos repassados para process_file
+        read_ahead: Ler os trabalhos em uma thread à parte, para que uma fonte
+            bloqueante (ex.: stdin) não atrase resultados e novas tentativas
+    
+    Yields:
+        Tuplas (arquivo, future) na ordem de conclusão
+    """
+    # As novas tentativas após erros transitórios são agendadas aqui, e não
+    # dormindo dentro do worker: durante o backoff, o worker segue livre
+    retry_count = process_kwargs.get('retry_count', 2)
+    worker_kwargs = {**process_kwargs, 'retry_count': 0}
+    retries: List[Tuple[float, int, Tuple[Path, Path, Optional[Path]], int]] = []  # (quando, desempate, trabalho, tentativa)
+    tiebreak = count()
+    in_flight: Dict[Future, Tuple[Tuple[Path, Path, Optional[Path]], int]] = {}
+    reader = ThreadPoolExecutor(max_workers=1) if read_ahead else None
+    next_job: Optional[Future] = None  # Leitura pendente do próximo trabalho (read_ahead)
+    exhausted = False
+    
+    def submit(job: Tuple[Path, Path, Optional[Path]], attempt: int) -> None:
+        file_path, job_output_dir, output_path = job
+        # O worker recebe o número da tentativa: mensagens e retry_attempts
+        # contam o total, como no modo sequencial
+        future = executor.submit(
+            process_file, file_path, job_output_dir,
+            output_path=output_path, first_attempt=attempt, **worker_kwargs
+        )
+        in_flight[future] = (job, attempt)
+    
+    try:
+        while True:
+            while retries and retries[0][0] <= time.monotonic():
+                _, _, job, attempt = heapq.heappop(retries)
+                logger.warning(" Tentativa %d/%d: %s", attempt + 1, retry_count + 1, job[0].name)
+                submit(job, attempt)
+            # Com a janela cheia, nenhum trabalho novo é lido
+            while not exhausted and len(in_flight) < window:
+                if reader is None:
+                    job = next(jobs, None)
+                else:
+                    if next_job is None:
+                        next_job = reader.submit(next, jobs, None)
+                    if not next_job.done():
+                        break
+                    job, next_job = next_job.result(), None
+                if job is None:
+                    exhausted = True
+                    break
+                # Arquivos na janela ainda esperam um worker: ler do disco já
+                prefetch_file(job[0])
+                submit(job, 0)
+            if exhausted and not in_flight and not retries:
+                break
+            timeout = max(0.0, retries[0][0] - time.monotonic()) if retries else None
+            waiting = set(in_flight)
+            if next_job is not None:
+                waiting.add(next_job)
+            if not waiting:
+                time.sleep(timeout)
+                continue
+            done, _ = wait(waiting, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future is next_job:
+                    continue  # Consumido no preenchimento da janela
+                job, attempt = in_flight.pop(future)
+                if (
+                    attempt < retry_count
+                    and isinstance(future.exception(), TransientProcessingError)
+                ):
+                    heapq.heappush(
+                        retries,
+                        (time.monotonic() + retry_delay(attempt + 1), next(tiebreak),
+                         job, attempt + 1)
+                    )
+                    continue
+                yield job[0], future
+    finally:
+        if reader is not None:
+            reader.shutdown(wait=False)
+
+
+def _run_parallel(
+    output_paths: Dict[Path, Path],
+    output_dir: Path,
+    workers: int,
+    converter_kwargs: Dict[str, Any],
+    process_kwargs: Dict[str, Any],
+    preload: bool = False,
+    warmup: bool = False
+) -> Iterator[Tuple[Path, Future]]:
+    """
+    Distribui arquivos entre processos worker, cada um com seu próprio conversor.
+    
+    Args:
+        output_paths: Mapeamento arquivo de entrada -> arquivo de saída
+        output_dir: Diretório de saída
+        workers: Número de processos
+        converter_kwargs: Argumentos repassados para build_converter em cada worker
+        process_kwargs: Argumentos repassados para process_file
+        preload: Construir o conversor no processo pai antes do fork
+        warmup: Aquecer o conversor de cada worker com uma conversão descartável
+    
+    Yields:
+        Tuplas (arquivo, future) na ordem de conclusão
+    """
+    jobs = ((file_path, output_dir, output_path) for file_path, output_path in output_paths.items())
+    with _worker_pool(workers, converter_kwargs, preload, warmup) as executor:
+        # Janela deslizante: no máximo SUBMIT_WINDOW_FACTOR * workers tarefas
+        # pendentes, em vez de um Future por arquivo desde o início
+        yield from _schedule(executor, jobs, SUBMIT_WINDOW_FACTOR * workers, process_kwargs)
+
+
+def serve(
+    output_dir: Path,
+    workers: int,
+    converter_kwargs: Dict[str, Any],
+    process_kwargs: Dict[str, Any],
+    preload: bool = False,
+    warmup: bool = False,
+    stream_in: Optional[TextIO] = None,
+    stream_out: Optional[TextIO] = None
+) -> int:
+    """
+    Modo servidor: mantém o conversor (ou o pool de workers) carregado e
+    processa trabalhos lidos da entrada, um objeto JSON por linha::
+    
+        {"input": "docs/a.pdf", "output": "saida/"}
+    
+    "output" é opcional (padrão: output_dir). Cada resultado é escrito na
+    saída como uma linha JSON, na ordem de conclusão::
+    
+        {"input": ..., "ok": true, "output": ..., "stats": {...}}
+        {"input": ..., "ok": false, "error": ...}
+    
+    O servidor termina quando a entrada é fechada (EOF).
+    
+    Args:
+        output_dir: Diretório de saída padrão
+        workers: Número de processos (1 = no próprio processo)
+        converter_kwargs: Argumentos repassados para build_converter
+        process_kwargs: Argumentos repassados para process_file
+        preload: Construir o conversor no processo pai antes do fork
+        warmup: Aquecer o(s) conversor(es) antes de aceitar trabalhos
+        stream_in: Entrada dos trabalhos (padrão: sys.stdin)
+        stream_out: Saída dos resultados (padrão: sys.stdout)
+        
+    Returns:
+        Código de saída (0)
+    """
+    global _periodic_release
+    stream_in = stream_in or sys.stdin
+    stream_out = stream_out or sys.stdout
+    write_lock = threading.Lock()
+    ready_dirs = set()
+    
+    def respond(input_path: Any, future: Future) -> None:
+        try:
+            output_path, file_stats = future.result()
+            payload = {"input": str(input_path), "ok": True,
+                       "output": str(output_path), "stats": file_stats}
+        except Exception as e:
+            payload = {"input": str(input_path), "ok": False, "error": str(e)}
+        line = json.dumps(payload, ensure_ascii=False, default=str)
+        # Trabalhos inválidos são respondidos pela thread de leitura
+        with write_lock:
+            stream_out.write(line + "\n")
+            stream_out.flush()
+    
+    def jobs() -> Iterator[Tuple[Path, Path, Optional[Path]]]:
+        for line in stream_in:
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                input_path = Path(job["input"]).absolute()
+                job_output_dir = Path(job.get("output") or output_dir).absolute()
+                if job_output_dir not in ready_dirs:
+                    ensure_dir(job_output_dir)
+                    ready_dirs.add(job_output_dir)
+            except Exception as e:
+                failed: Future = Future()
+                failed.set_exception(ConfigurationError(f"Trabalho inválido: {e}"))
+                respond(line.strip(), failed)
+                continue
+            yield input_path, job_output_dir, None
+    
+    if workers <= 1:
+        converter = build_converter(**converter_kwargs)
+        if warmup:
+            warmup_converter(converter)
+        logger.info(" Servidor pronto (1 worker); aguardando trabalhos na entrada padrão")
+        # O servidor vive até o EOF: liberar memória periodicamente
+        _periodic_release = True
+        try:
+            for input_path, job_output_dir, _ in jobs():
+                future: Future = Future()
+                try:
+                    future.set_result(
+                        process_file(input_path, job_output_dir, converter=converter, **process_kwargs)
+                    )
+                except Exception as e:
+                    future.set_exception(e)
+                respond(input_path, future)
+        finally:
+            _periodic_release = False
+        return 0
+    
+    with _worker_pool(workers, converter_kwargs, preload, warmup) as executor:
+        logger.info(f" Servidor pronto ({workers} workers); aguardando trabalhos na entrada padrão")
+        # Mesmo escalonamento do modo em lote; a entrada é lida em outra
+        # thread para que os resultados não esperem pela próxima linha
+        for input_path, future in _schedule(
+            executor, jobs(), SUBMIT_WINDOW_FACTOR * workers, process_kwargs, read_ahead=True
+        ):
+            respond(input_path, future)
+    return 0
+
+
 def signal_handler(signum, frame):
     """Handler para sinais de interrupção."""
     logger.warning(f" Sinal {signum} recebido. Finalizando processamento...")
@@ -511,13 +1463,11 @@ def signal_handler(signum, frame):
     sys.exit(1)
 
 
-def run(argv: Optional[List[str]] = None) -> int:
-    """
-    Ponto de entrada principal com validação robusta e logging detalhado.
-    
-    Returns:
-        Código de saída (0=sucesso, 1=sucesso parcial, 2=falha total)
-    """
+_PARSER: Optional[argparse.ArgumentParser] = None
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Constrói o parser de argumentos da linha de comando."""
     parser = argparse.ArgumentParser(
         description="Processa documentos e extrai Markdown usando docling.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -564,6 +1514,18 @@ Exemplos de uso:
         default=DEFAULT_TIMEOUT, 
         help=f"Timeout por arquivo em segundos (padrão: {DEFAULT_TIMEOUT})"
     )
+    parser.add_argument(
+        "--preload-models",
+        action="store_true",
+        help="Carregar os modelos no processo pai antes do fork (Linux), "
+             "compartilhando-os entre os workers em vez de uma cópia por worker"
+    )
+    parser.add_argument(
+        "--warmup",
+        action="store_true",
+        help="Aquecer o conversor de cada worker com uma conversão descartável de um PDF "
+             "de uma página, tirando o custo da primeira chamada dos documentos reais"
+    )
     
     # Limites de arquivo
     parser.add_argument(
@@ -592,7 +1554,7 @@ Exemplos de uso:
         help="Modo TableFormer (padrão: accurate)"
     )
     parser.add_argument(
-        "--disable-tables", 
+        "--disable-tables", "--no-table-structure",
         action="store_true", 
         help="Desabilitar reconhecimento de estrutura de tabelas"
     )
@@ -612,7 +1574,7 @@ Exemplos de uso:
         "--retry", 
         type=int, 
         default=2, 
-        help="Número de tentativas em caso de falha (padrão: 2)"
+        help="Número de novas tentativas em caso de erro transitório de I/O (padrão: 2)"
     )
     parser.add_argument(
         "--continue-on-error", 
@@ -653,15 +1615,75 @@ Exemplos de uso:
         action="store_true", 
         help="Simular processamento sem executar"
     )
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="Manter conversor/workers carregados e ler trabalhos JSON (um por linha) "
+             "da entrada padrão; resultados em JSON na saída padrão, logs na saída de erro"
+    )
+    
+    return parser
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    """Retorna o parser de argumentos, construindo-o apenas na primeira chamada."""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = _build_parser()
+    return _PARSER
+
 
-    args = parser.parse_args(argv)
+def _kwargs_from_args(args: argparse.Namespace) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Traduz os argumentos da linha de comando para process_file e build_converter.
+    
+    Args:
+        args: Argumentos já interpretados
+        
+    Returns:
+        Tupla (process_kwargs, converter_kwargs)
+    """
+    # Parâmetros para process_file
+    process_kwargs = {
+        'ocr_mode': args.ocr,
+        'max_pages': args.max_pages,
+        'max_file_size': args.max_file_size,
+        'timeout': args.timeout,
+        'enable_enrichment': args.enrichment,
+        'retry_count': args.retry
+    }
+    
+    # Parâmetros para build_converter (um conversor por processo)
+    converter_kwargs = {
+        'ocr_mode': args.ocr,
+        'enable_table_structure': not args.disable_tables,
+        'table_mode': args.table_mode,
+        'artifacts_path': args.artifacts_path,
+        'enable_remote_services': args.remote_services,
+        'enable_code_enrichment': args.enrichment,
+        'enable_formula_enrichment': args.enrichment,
+        'enable_picture_classification': args.enrichment
+    }
     
-    # Configurar logging
+    return process_kwargs, converter_kwargs
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Ponto de entrada principal com validação robusta e logging detalhado.
+    
+    Returns:
+        Código de saída (0=sucesso, 1=sucesso parcial, 2=falha total)
+    """
+    args = _get_parser().parse_args(argv)
+    
+    # Configurar logging; no modo servidor, a saída padrão é do protocolo
+    log_stream = sys.stderr if args.server else None
     if args.quiet:
-        setup_logging(verbose=False, log_file=args.log_file)
+        setup_logging(verbose=False, log_file=args.log_file, stream=log_stream)
         logging.getLogger().setLevel(logging.ERROR)
     else:
-        setup_logging(args.verbose, args.log_file)
+        setup_logging(args.verbose, args.log_file, stream=log_stream)
     
     # Configurar handlers de sinal
     signal.signal(signal.SIGINT, signal_handler)
@@ -676,7 +1698,7 @@ Exemplos de uso:
         
         # Verificar recursos do sistema
         if args.check_system:
-            check_system_resources()
+            check_system_resources(args.output)
             return 0
         
         # Baixar modelos se solicitado
@@ -686,7 +1708,7 @@ Exemplos de uso:
             return 0
         
         # Verificar recursos do sistema
-        resources = check_system_resources()
+        resources = check_system_resources(args.output)
         
         # Ajustar número de workers baseado nos recursos
         if args.workers > resources['cpu_count']:
@@ -697,9 +1719,17 @@ Exemplos de uso:
             logger.warning(" Reduzindo workers devido à memória limitada")
             args.workers = 2
         
+        # Modo servidor: conversor/workers carregados uma vez para vários trabalhos
+        if args.server:
+            process_kwargs, converter_kwargs = _kwargs_from_args(args)
+            return serve(
+                args.output.absolute(), args.workers, converter_kwargs, process_kwargs,
+                preload=args.preload_models, warmup=args.warmup
+            )
+        
         # Validar diretórios
-        input_dir: Path = args.input.resolve()
-        output_dir: Path = args.output.resolve()
+        input_dir: Path = args.input.absolute()
+        output_dir: Path = args.output.absolute()
         
         if not input_dir.exists():
             logger.error(f" Diretório de entrada não existe: {input_dir}")
@@ -713,19 +1743,18 @@ Exemplos de uso:
         # Buscar e validar arquivos
         logger.info(" Buscando arquivos para processar...")
         
-        all_files = list(input_dir.rglob("*"))
-        candidate_files = [
-            p for p in all_files
-            if p.is_file() and not p.name.startswith('.') and p.suffix.lower() in SUPPORTED_EXTENSIONS
-        ]
+        candidate_files = list(iter_candidate_files(input_dir))
         
         logger.info(f" Encontrados {len(candidate_files)} arquivos candidatos")
         
-        # Validar arquivos
-        files_to_process = []
-        for file_path in sorted(candidate_files):
-            if validate_file(file_path, args.max_file_size):
-                files_to_process.append(file_path)
+        # A ordem só importa no modo sequencial e no dry-run; nesses casos,
+        # ordenar pelo nome (str) evita as comparações entre objetos Path
+        if args.workers <= 1 or args.dry_run:
+            candidate_files.sort(key=attrgetter("name"))
+        
+        # Validar arquivos, guardando o tamanho lido pelo mesmo stat()
+        file_sizes = valid_file_sizes(candidate_files, args.max_file_size)
+        files_to_process = list(file_sizes)
         
         stats = ProcessingStats(
             total_files=len(files_to_process),
@@ -738,10 +1767,15 @@ Exemplos de uso:
         
         logger.info(f" {stats.total_files} arquivos válidos para processar")
         
+        # Com vários workers, os maiores arquivos começam primeiro (LPT), para
+        # que um documento grande não fique sozinho no fim da fila
+        if args.workers > 1 and not args.dry_run:
+            files_to_process.sort(key=file_sizes.__getitem__, reverse=True)
+        
         if args.dry_run:
             logger.info(" Modo dry-run - listando arquivos:")
             for i, file_path in enumerate(files_to_process[:10], 1):
-                size_mb = file_path.stat().st_size / (1024**2)
+                size_mb = file_sizes[file_path] / (1024**2)
                 logger.info(f"  {i:3d}. {file_path.name} ({size_mb:.1f}MB)")
             if len(files_to_process) > 10:
                 logger.info(f"  ... e mais {len(files_to_process) - 10} arquivos")
@@ -750,58 +1784,72 @@ Exemplos de uso:
         # Processar arquivos
         logger.info(f" Iniciando processamento com {args.workers} workers")
         
-        # Parâmetros para process_file
-        process_kwargs = {
-            'ocr_mode': args.ocr,
-            'max_pages': args.max_pages,
-            'max_file_size': args.max_file_size,
-            'timeout': args.timeout,
-            'enable_enrichment': args.enrichment,
-            'retry_count': args.retry
-        }
+        process_kwargs, converter_kwargs = _kwargs_from_args(args)
+        
+        # Caminhos de saída calculados uma única vez, fora do laço de processamento
+        output_paths = plan_output_paths(files_to_process, output_dir)
         
         failed_files = []
         
-        with ProcessPoolExecutor(max_workers=args.workers) as executor:
-            # Submeter tarefas
-            future_to_file = {
-                executor.submit(
-                    process_file, 
-                    file_path, 
-                    output_dir, 
-                    **process_kwargs
-                ): file_path
-                for file_path in files_to_process
-            }
-            
-            # Processar resultados
-            for i, future in enumerate(as_completed(future_to_file), 1):
-                file_path = future_to_file[future]
-                progress_pct = (i / stats.total_files) * 100
+        # Com um único worker, processar no próprio processo (determinístico)
+        if args.workers <= 1:
+            converter = build_converter(**converter_kwargs)
+            if args.warmup:
+                warmup_converter(converter)
+            batch_size = (
+                _docling.settings.perf.doc_batch_size if _docling else DEFAULT_DOC_BATCH_SIZE
+            )
+            results = _run_sequential(
+                output_paths, output_dir, converter, process_kwargs, batch_size
+            )
+        else:
+            results = _run_parallel(
+                output_paths, output_dir, args.workers, converter_kwargs, process_kwargs,
+                preload=args.preload_models, warmup=args.warmup
+            )
+        
+        # Processar resultados: detalhe por arquivo só em DEBUG (sempre vai
+        # para o --log-file); no console, uma linha agregada a cada
+        # PROGRESS_EVERY arquivos ou PROGRESS_INTERVAL segundos
+        last_report = time.monotonic()
+        for i, (file_path, future) in enumerate(results, 1):
+            try:
+                output_path, file_stats = future.result()
+                stats.successful += 1
                 
-                try:
-                    output_path, file_stats = future.result()
-                    stats.successful += 1
-                    
-                    logger.info(
-                        f" [{i:3d}/{stats.total_files}] ({progress_pct:5.1f}%) "
-                        f"{file_path.name} -> {output_path.name}"
-                    )
-                    
-                except DocumentProcessingError as e:
-                    stats.failed += 1
-                    failed_files.append((file_path, str(e)))
+                logger.debug(
+                    " [%3d/%d] %s -> %s", i, stats.total_files, file_path.name, output_path.name
+                )
+                
+            except DocumentProcessingError as e:
+                stats.failed += 1
+                failed_files.append((file_path, str(e)))
+                
+                if args.continue_on_error:
+                    logger.error(" [%3d/%d] %s: %s", i, stats.total_files, file_path.name, e)
+                else:
+                    logger.error(f" Parando devido a erro: {e}")
+                    break
                     
-                    if args.continue_on_error:
-                        logger.error(f" [{i:3d}/{stats.total_files}] {file_path.name}: {e}")
-                    else:
-                        logger.error(f" Parando devido a erro: {e}")
-                        break
-                        
-                except Exception as e:
-                    stats.failed += 1
-                    failed_files.append((file_path, f"Erro inesperado: {e}"))
-                    logger.error(f" [{i:3d}/{stats.total_files}] {file_path.name}: Erro inesperado: {e}")
+            except Exception as e:
+                stats.failed += 1
+                failed_files.append((file_path, f"Erro inesperado: {e}"))
+                logger.error(" [%3d/%d] %s: Erro inesperado: %s", i, stats.total_files, file_path.name, e)
+            
+            now = time.monotonic()
+            if (
+                i % PROGRESS_EVERY == 0
+                or now - last_report >= PROGRESS_INTERVAL
+                or i == stats.total_files
+            ):
+                last_report = now
+                logger.info(
+                    " [%3d/%d] (%5.1f%%) %d sucessos, %d falhas",
+                    i, stats.total_files, i / stats.total_files * 100,
+                    stats.successful, stats.failed
+                )
+        
+        results.close()
         
         # Finalizar estatísticas
         stats.end_time = time.time()
@@ -1,21 +1,112 @@
-import pytest
-import sys
+import logging
+import os
+import shutil
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+
+SHM_DIR = "/dev/shm"
+
+
+def pytest_configure(config):
+    """Coloca os tmp_path em tmpfs (/dev/shm) quando disponível e não configurado pelo usuário."""
+    if "PYTEST_DEBUG_TEMPROOT" not in os.environ and os.access(SHM_DIR, os.W_OK):
+        os.environ["PYTEST_DEBUG_TEMPROOT"] = SHM_DIR
+
 
+@pytest.fixture(scope="session")
+def tk_root():
+    """Um único interpretador Tk (oculto) para toda a sessão de testes."""
+    import tkinter as tk
 
-@pytest.fixture(autouse=True)
-def setup_path():
-    """Adiciona automaticamente o diretório raiz ao sys.path para todos os testes."""
-    root_dir = Path(__file__).resolve().parents[1]
-    if str(root_dir) not in sys.path:
-        sys.path.insert(0, str(root_dir))
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("Tk indisponível (sem display)")
+    root.withdraw()  # Esconder janela durante testes
+    yield root
+    root.destroy()
+
+
+def clear_root(tk_root):
+    """Cancela callbacks pendentes e remove os widgets filhos do root compartilhado."""
+    for after_id in tk_root.tk.splitlist(tk_root.tk.call("after", "info")):
+        tk_root.after_cancel(after_id)
+    for widget in tk_root.winfo_children():
+        widget.destroy()
 
 
 @pytest.fixture
-def sample_files(tmp_path):
-    """Cria arquivos de exemplo para testes."""
-    inp_dir = tmp_path / "input"
-    out_dir = tmp_path / "output"
+def root(tk_root):
+    """Root Tk compartilhado; após cada teste, remove widgets filhos e callbacks pendentes."""
+    yield tk_root
+    clear_root(tk_root)
+
+
+@pytest.fixture
+def gui_module():
+    """Módulo da GUI, importado uma vez e reaproveitado pelos fixtures de substituição."""
+    import src.gui.gui as gui
+    return gui
+
+
+@pytest.fixture
+def patch_askdirectory(gui_module, monkeypatch):
+    """Substitui filedialog.askdirectory por um Mock (troca direta de atributo)."""
+    mock = Mock()
+    monkeypatch.setattr(gui_module.filedialog, "askdirectory", mock)
+    return mock
+
+
+@pytest.fixture
+def patch_showerror(gui_module, monkeypatch):
+    """Substitui messagebox.showerror por um Mock (troca direta de atributo)."""
+    mock = Mock()
+    monkeypatch.setattr(gui_module.messagebox, "showerror", mock)
+    return mock
+
+
+@pytest.fixture
+def patch_gui_processing(gui_module, monkeypatch):
+    """Substitui build_converter, process_file e ensure_dir da GUI por Mocks."""
+    mocks = SimpleNamespace(build_converter=Mock(), process_file=Mock(), ensure_dir=Mock())
+    for name, mock in vars(mocks).items():
+        monkeypatch.setattr(gui_module, name, mock)
+    return mocks
+
+
+@pytest.fixture
+def root_logging():
+    """Logger root; handlers e nível são restaurados após o teste (setup_logging os substitui)."""
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    yield root_logger
+    root_logger.handlers[:] = handlers
+    root_logger.setLevel(level)
+
+
+@pytest.fixture
+def patch_build_converter(monkeypatch):
+    """Substitui src.main.build_converter por um Mock (troca direta de atributo)."""
+    import src.main as main
+    mock = Mock()
+    monkeypatch.setattr(main, "build_converter", mock)
+    return mock
+
+
+@pytest.fixture(scope="module")
+def sample_files(tmp_path_factory):
+    """
+    Cria arquivos de exemplo uma única vez por módulo de testes.
+    
+    Somente leitura: testes que alteram a entrada devem usar sample_files_rw.
+    """
+    base_dir = tmp_path_factory.mktemp("docling_inputs")
+    inp_dir = base_dir / "input"
+    out_dir = base_dir / "output"
     inp_dir.mkdir()
     out_dir.mkdir()
     
@@ -38,7 +129,70 @@ def sample_files(tmp_path):
 
 
 @pytest.fixture
+def sample_files_rw(sample_files, tmp_path):
+    """Cópia própria de sample_files para testes que alteram a entrada ou a saída."""
+    inp_dir = tmp_path / "input"
+    out_dir = tmp_path / "output"
+    shutil.copytree(sample_files["input_dir"], inp_dir)
+    out_dir.mkdir()
+    return {
+        "input_dir": inp_dir,
+        "output_dir": out_dir,
+        "files": sample_files["files"]
+    }
+
+
+@pytest.fixture
+def io_dirs(tmp_path):
+    """Diretórios in/ e out/ vazios, com um único in/test.pdf para os testes de run()."""
+    inp_dir = tmp_path / "in"
+    out_dir = tmp_path / "out"
+    inp_dir.mkdir()
+    out_dir.mkdir()
+    (inp_dir / "test.pdf").write_bytes(b"x")  # não vazio: arquivos vazios são rejeitados
+    return inp_dir, out_dir
+
+
+def list_test_gui_files(test_dir: Path = Path("test_gui_files")) -> list:
+    """Arquivos suportados em test_gui_files (ver create_test_files_gui.py); vazio se não existir."""
+    from src.main import SUPPORTED_EXTENSIONS
+    if not test_dir.is_dir():
+        return []
+    return [
+        p for p in test_dir.iterdir()
+        if p.suffix.lower() in SUPPORTED_EXTENSIONS and p.is_file()
+    ]
+
+
+@pytest.fixture(scope="session")
+def candidate_files():
+    """Lista os arquivos de test_gui_files uma única vez por sessão; pula se não houver nenhum."""
+    files = list_test_gui_files()
+    if not files:
+        pytest.skip("test_gui_files ausente (execute: python create_test_files_gui.py)")
+    return files
+
+
+class DummyDoc:
+    """Documento falso: export_to_markdown devolve sempre o mesmo texto."""
+    MARKDOWN = "# dummy\n"
+
+    def export_to_markdown(self):
+        return self.MARKDOWN
+
+
+class DummyConverter:
+    """Conversor falso com a interface do DocumentConverter: convert(...).document."""
+    RESULT = SimpleNamespace(document=DummyDoc())
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def convert(self, path, **kwargs):
+        return self.RESULT
+
+
+@pytest.fixture(scope="session")
 def dummy_converter():
-    """Retorna uma instância do DummyConverter para uso em testes."""
-    from tests.test_process import DummyConverter
+    """Instância única do DummyConverter; não guarda estado, então é compartilhada na sessão."""
     return DummyConverter()